@@ -37,4 +37,6 @@ async def on_ready():
     finally:
         pass
 
-bot.run(DISCORD_BOT_TOKEN)
+# The rendering processes are spawned and import this module again, only the main process runs the bot
+if __name__ == "__main__":
+    bot.run(DISCORD_BOT_TOKEN)
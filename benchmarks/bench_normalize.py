@@ -0,0 +1,75 @@
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.trade.ticker import Ticker
+
+#-----------------------------------------------------------
+# Micro-benchmark of the bar normalization in Ticker
+# Run from the repository root: python benchmarks/bench_normalize.py
+#-----------------------------------------------------------
+
+def make_bars(days=10, interval_minutes=1):
+    """
+    Create a frame of regular session bars shaped like a yfinance download (UTC index)
+    :param days: Number of trading days
+    :param interval_minutes: Interval in minutes of the bars
+    """
+    sessions = pd.bdate_range('2024-03-04', periods=days)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{session.date()} 09:30", f"{session.date()} 15:59", freq=f"{interval_minutes}min", tz='America/New_York').tz_convert('UTC')
+        for session in sessions
+    ]), name='Datetime')
+    close = 100 + np.cumsum(np.random.randn(len(index)) * 0.05)
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + 0.1,
+        'Low': close - 0.1,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': np.random.randint(1000, 100000, len(index)),
+    }, index=index)
+
+
+def legacy_normalize(stock_data, timezone='America/New_York'):
+    """
+    Normalization as it was done before, per row string formatting
+    """
+    if stock_data.index.tzinfo is not None:
+        stock_data.index = stock_data.index.tz_convert(timezone)
+    else:
+        stock_data.index = stock_data.index.tz_localize('UTC').tz_convert(timezone)
+
+    new_data = pd.DataFrame()
+    new_data['time'] = stock_data.index.time
+    new_data['time'] = new_data['time'].apply(lambda x: str(x).split(':')[0] + ':' + str(x).split(':')[1])
+    new_data['datetime'] = stock_data.index
+    new_data['offset'] = new_data['datetime'].apply(lambda x: int(str(x).split('-')[-1].split(':')[0]))
+
+    stock_data['date'] = stock_data.index.date
+    stock_data.reset_index(inplace=True)
+    stock_data['time (EDT)'] = new_data['time']
+    return stock_data
+
+
+if __name__ == "__main__":
+    bars = make_bars()
+    ticker = Ticker('BENCH')
+    number = 20
+
+    legacy = timeit.timeit(lambda: legacy_normalize(bars.copy()), number=number) / number
+    current = timeit.timeit(lambda: ticker.set_historical_data(bars.copy()), number=number) / number
+
+    expected = legacy_normalize(bars.copy())
+    result = ticker.set_historical_data(bars.copy())
+    assert (expected['time (EDT)'] == result['time (EDT)']).all()
+    assert (expected['date'] == result['date']).all()
+
+    print(f"Bars: {len(bars)} (10 days of 1m)")
+    print(f"Legacy normalization: {legacy * 1000:.2f} ms, {expected.memory_usage(deep=True).sum() / 1024:.0f} KiB")
+    print(f"Vectorized normalization: {current * 1000:.2f} ms, {result.memory_usage(deep=True).sum() / 1024:.0f} KiB")
+    print(f"Speedup: {legacy / current:.1f}x")
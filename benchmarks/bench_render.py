@@ -0,0 +1,82 @@
+import os
+import sys
+import io
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from module.trade.ticker import Ticker
+from module.trade.indicator.signal_satypivotribbon import SignalSatypePivotRibbon
+from module.trade.indicator.plot_template import PLOT_PROFILES, get_plot_template
+from bench_normalize import make_bars
+
+#-----------------------------------------------------------
+# Benchmark of the Saty Pivot Ribbon chart rendering
+# Run from the repository root: python benchmarks/bench_render.py
+#-----------------------------------------------------------
+
+def legacy_render(plot_data):
+    """
+    Rendering as it was done before, a new figure with a full layout for every chart
+    """
+    x = plot_data["x"]
+    fast_ema = plot_data["fast_ema"]
+    pivot_ema = plot_data["pivot_ema"]
+    slow_ema = plot_data["slow_ema"]
+
+    fig, (ax, ax1) = plt.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [4, 1]})
+    ax.plot(x, plot_data["close"], label='Close Price', color='black', alpha=0.3)
+    ax.plot(x, fast_ema, label='Fast EMA (8)', color='green')
+    ax.plot(x, pivot_ema, label='Pivot EMA (21)', color='blue')
+    ax.plot(x, slow_ema, label='Slow EMA (34)', color='red')
+    ax.fill_between(x, fast_ema, pivot_ema, where=(fast_ema >= pivot_ema), facecolor='green', alpha=0.5)
+    ax.fill_between(x, fast_ema, pivot_ema, where=(fast_ema < pivot_ema), facecolor='red', alpha=0.5)
+    ax.fill_between(x, pivot_ema, slow_ema, where=(pivot_ema >= slow_ema), facecolor='blue', alpha=0.5)
+    ax.fill_between(x, pivot_ema, slow_ema, where=(pivot_ema < slow_ema), facecolor='orange', alpha=0.5)
+    for date, is_bullish in plot_data["cloud_transitions"]:
+        ax.annotate('^ Clouds' if is_bullish else 'v Clouds', xy=(date, slow_ema[date]), xytext=(date, slow_ema[date] * (0.995 if is_bullish else 1.005)), arrowprops=dict(facecolor='green' if is_bullish else 'red', shrink=0.005))
+    for date, is_bullish in plot_data["conviction_transitions"]:
+        ax.annotate('^ Conviction' if is_bullish else 'v Conviction', xy=(date, slow_ema[date]), xytext=(date, slow_ema[date] * (0.995 if is_bullish else 1.005)), arrowprops=dict(facecolor='green' if is_bullish else 'red', shrink=0.005))
+    ax.set_ylabel('Price')
+    ax1.bar(x, plot_data["volume"], color=plot_data["volume_color"], alpha=0.3)
+    ax1.set_xlabel('5min TICKS')
+    ax1.set_ylabel('Volume')
+    ax1.grid(True)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png')
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def charts_per_second(render_func, plot_data_list):
+    """
+    Render every plot data and measure the throughput
+    :return: Tuple of charts per second and average image size in bytes
+    """
+    start = time.perf_counter()
+    sizes = [len(render_func(plot_data)) for plot_data in plot_data_list]
+    elapsed = time.perf_counter() - start
+    return len(plot_data_list) / elapsed, sum(sizes) / len(sizes)
+
+
+if __name__ == "__main__":
+    signal = SignalSatypePivotRibbon()
+    plot_data_list = []
+    for i in range(20):
+        ticker = Ticker(f'BENCH{i}')
+        ticker.set_historical_data(make_bars(days=5, interval_minutes=5))
+        plot_data_list.append(signal.get_plot_data(ticker))
+
+    rate, size = charts_per_second(legacy_render, plot_data_list)
+    print(f"{'legacy (new figure)':<24} {rate:6.1f} charts/s {size / 1024:7.1f} KiB")
+    for profile in PLOT_PROFILES:
+        # Create the template before timing, as a rendering process does on its first chart
+        template = get_plot_template(profile)
+        rate, size = charts_per_second(template.render, plot_data_list)
+        print(f"{'template ' + profile:<24} {rate:6.1f} charts/s {size / 1024:7.1f} KiB")
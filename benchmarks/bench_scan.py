@@ -0,0 +1,160 @@
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import datetime
+import subprocess
+import contextlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fake_yfinance import FakeYFinance
+from module.trade import state_store, symbol_validator
+from module.trade.state_store import StateStore
+from module.flow.generate_indicator import GenerateIndicator
+
+#-----------------------------------------------------------
+# Benchmark of the signal scan on synthetic data, yfinance is replaced by a local stand-in
+# Every size runs in a new temporary working directory (.data), the results are written as JSON
+# The first scan publishes (renders) a signal for every ticker, as after adding the tickers to the watchlist
+# Run from the repository root: python benchmarks/bench_scan.py --sizes 10,100,1000 --output bench_scan.json
+#-----------------------------------------------------------
+
+def get_commit():
+    """
+    Get the commit of the benchmarked code, None outside of a git repository
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+@contextlib.contextmanager
+def working_directory():
+    """
+    Run in a new temporary working directory with new process level stores, so that every size starts cold
+    """
+    previous = os.getcwd()
+    folder = tempfile.mkdtemp(prefix='bench_scan_')
+    os.chdir(folder)
+    state_store.state_stores.clear()
+    symbol_validator.symbol_validators.clear()
+    try:
+        yield folder
+    finally:
+        for store in state_store.state_stores.values():
+            store.connection.close()
+        state_store.state_stores.clear()
+        symbol_validator.symbol_validators.clear()
+        os.chdir(previous)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def measure(results, name, symbols, func, count=None, fake=None):
+    """
+    Time a function with its output silenced and record the result
+    :param count: Number of items processed, for the time per item (default: number of symbols)
+    :param fake: yfinance stand-in, to record the number of requests made by the function
+    """
+    count = count if count is not None else symbols
+    requests = fake.requests if fake is not None else 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - start
+    results.append({
+        "name": name,
+        "symbols": symbols,
+        "seconds": round(seconds, 6),
+        "per_item_ms": round(seconds * 1000 / max(count, 1), 4),
+        "requests": fake.requests - requests if fake is not None else 0,
+    })
+    print(f"{name:<28} {symbols:>6} symbols {seconds:9.3f} s {seconds * 1000 / max(count, 1):9.3f} ms/item")
+    return value
+
+
+def run_size(size, batch_size, plots, fake):
+    """
+    Benchmark the scan stages for a watchlist of the given size
+    :return: List of the results
+    """
+    results = []
+    symbols = [f"SYM{i:04d}" for i in range(size)]
+    with working_directory():
+        os.makedirs('.data')
+        with open('.data/1_ticker_manager.json', 'w') as tickers_file:
+            tickers_file.write(json.dumps({"ticker_list": symbols}))
+
+        gi = GenerateIndicator(batch_size=batch_size)
+        # One event loop for all the scans, as in the bot
+        loop = asyncio.new_event_loop()
+        try:
+            # Full scan, the first one downloads the whole range and publishes a signal for every ticker, the second one only downloads the new bars
+            measure(results, "execute_gi_cold", size, lambda: loop.run_until_complete(gi.execute_gi()), fake=fake)
+            measure(results, "execute_gi_warm", size, lambda: loop.run_until_complete(gi.execute_gi()), fake=fake)
+
+            tickers = [gi.Ticker_Manager.get_ticker(symbol) for symbol in symbols]
+            signal = gi.Signal_List[0]
+
+            # Signal computation, from the stored EMA state and from no state
+            measure(results, "compute_warm", size, lambda: [signal.compute(ticker) for ticker in tickers])
+            for ticker in tickers:
+                signal.write_cache(ticker.symbol, signal.signal_name, {})
+            measure(results, "compute_cold", size, lambda: [signal.compute(ticker) for ticker in tickers])
+
+            # Plot rendering in this process
+            plot_tickers = tickers[:min(plots, size)]
+            measure(results, "compute_and_plot", size, lambda: [signal.compute_and_plot(ticker) for ticker in plot_tickers], len(plot_tickers))
+
+            # Signal state I/O: one flush of every state, a cold load of the whole store, the reads
+            store = signal.state_store
+            for ticker in tickers:
+                store.put(ticker.symbol, signal.signal_name, store.get(ticker.symbol, signal.signal_name))
+            measure(results, "state_flush", size, store.flush)
+            measure(results, "state_load", size, lambda: StateStore(store.path).connection.close())
+            measure(results, "state_read", size, lambda: [signal.read_cache(ticker.symbol, signal.signal_name) for ticker in tickers])
+
+            # Bar cache I/O: read every stored range
+            start_date, end_date, interval = gi.get_data_range()
+            measure(results, "bar_cache_read", size, lambda: [
+                ticker.set_historical_data(gi.Ticker_Manager.bar_cache.bar_store.read(ticker.symbol, interval)) for ticker in tickers
+            ])
+        finally:
+            gi.shutdown()
+            loop.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the signal scan offline")
+    parser.add_argument("--sizes", default="10,100,1000", help="Watchlist sizes (comma separated)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Tickers per grouped download (0 downloads each ticker separately)")
+    parser.add_argument("--plots", type=int, default=10, help="Maximum number of plots rendered per size")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every fake request waits")
+    parser.add_argument("--output", default="bench_scan.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    report = {
+        "commit": get_commit(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"batch_size": args.batch_size, "plots": args.plots, "latency_seconds": args.latency},
+        "results": [],
+    }
+    for size in [int(size) for size in args.sizes.split(',')]:
+        with FakeYFinance(latency_seconds=args.latency) as fake:
+            report["results"] += run_size(size, args.batch_size, args.plots, fake)
+
+    with open(args.output, 'w') as output_file:
+        output_file.write(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
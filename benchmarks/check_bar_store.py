@@ -0,0 +1,77 @@
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_yfinance import make_session_bars
+from module.trade.bar_store import BarStore
+
+#-----------------------------------------------------------
+# Regression checks of the bar store: bars written before or inside the stored history are merged with it, no stored bar is lost
+# Run from the repository root: python benchmarks/check_bar_store.py
+#-----------------------------------------------------------
+
+def make_bars(symbol, first_session, last_session):
+    """
+    Create the bars of the sessions in the exchange timezone, as downloaded
+    """
+    return pd.concat([make_session_bars(symbol, session.date()) for session in pd.bdate_range(first_session, last_session)])
+
+
+def check_write_before_history(folder):
+    """
+    Write a newer range, then an older range overlapping it, then an older range with a gap before it
+    """
+    store = BarStore(folder)
+    newer = make_bars('SPY', '2026-03-09', '2026-03-13')
+    store.write('SPY', '5m', newer)
+
+    # Older range overlapping the first stored session
+    overlapping = make_bars('SPY', '2026-03-04', '2026-03-09')
+    store.write('SPY', '5m', overlapping)
+    # Older range ending before the stored history
+    older = make_bars('SPY', '2026-02-23', '2026-02-27')
+    store.write('SPY', '5m', older)
+
+    expected = pd.concat([older, overlapping, newer])
+    expected = expected[~expected.index.duplicated(keep='first')].sort_index().tz_convert('UTC')
+    stored = store.read('SPY', '5m')
+    assert isinstance(stored.index, pd.DatetimeIndex), "The stored index is not a DatetimeIndex"
+    assert stored.index.is_monotonic_increasing and stored.index.is_unique, "The stored bars are not ordered"
+    assert stored.index.equals(expected.index), "The stored bars do not match the written ranges"
+    assert (stored['Close'].to_numpy() == expected['Close'].to_numpy()).all(), "The stored prices do not match the written ranges"
+    print(f"Write before the stored history: OK ({len(stored)} bars)")
+
+
+def check_write_inside_history(folder):
+    """
+    Write a range inside the stored range, the stored bars after it are kept
+    """
+    store = BarStore(folder)
+    stored = make_bars('QQQ', '2026-03-02', '2026-03-13')
+    store.write('QQQ', '5m', stored)
+
+    inside = make_bars('QQQ', '2026-03-04', '2026-03-05')
+    inside['Close'] = inside['Close'] + 1.0
+    store.write('QQQ', '5m', inside)
+
+    result = store.read('QQQ', '5m')
+    assert len(result) == len(stored), f"The store has {len(result)} bars instead of {len(stored)}"
+    assert result.index[-1] == stored.index[-1], f"The last stored bar is {result.index[-1]} instead of {stored.index[-1]}"
+    assert result.index.is_monotonic_increasing and result.index.is_unique, "The stored bars are not ordered"
+    written = result.index.isin(inside.index)
+    assert (result['Close'][written].to_numpy() == inside['Close'].to_numpy()).all(), "The written bars are not stored"
+    assert (result['Close'][~written].to_numpy() == stored['Close'][~stored.index.isin(inside.index)].to_numpy()).all(), "The other bars changed"
+    print(f"Write inside the stored history: OK ({len(result)} bars)")
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp(prefix='check_bar_store_')
+    try:
+        check_write_before_history(folder)
+        check_write_inside_history(folder)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,133 @@
+import time
+import hashlib
+import datetime
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+#-----------------------------------------------------------
+# Local stand-in for yf.download and yf.Ticker, used by the benchmarks to run the real scan path offline
+# Every symbol gets deterministic regular session bars, the same bar always has the same prices
+# so that the incremental downloads line up with the cached bars
+#-----------------------------------------------------------
+
+def symbol_seed(symbol):
+    """
+    Get a stable seed for the symbol
+    """
+    return int.from_bytes(hashlib.md5(symbol.encode('utf-8')).digest()[:4], 'big')
+
+
+def make_session_bars(symbol, session, interval_minutes=5):
+    """
+    Create the bars of one regular session of the symbol, shaped like a yfinance download
+    :param session: Date of the session
+    :param interval_minutes: Interval in minutes of the bars
+    """
+    index = pd.date_range(f"{session} 09:30", f"{session} 15:59", freq=f"{interval_minutes}min", tz='America/New_York', name='Datetime')
+    rng = np.random.default_rng([symbol_seed(symbol), session.toordinal(), interval_minutes])
+    base = 20 + symbol_seed(symbol) % 480
+    close = base * np.exp(np.cumsum(rng.standard_normal(len(index)) * 0.002))
+    return pd.DataFrame({
+        'Open': np.roll(close, 1),
+        'High': close * 1.001,
+        'Low': close * 0.999,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1000, 100000, len(index)),
+    }, index=index)
+
+
+class FakeYFinance:
+    """
+    A class to represent the local yfinance stand-in
+    install() replaces yf.download and yf.Ticker until uninstall()
+    """
+    def __init__(self, latency_seconds=0.0, invalid_symbols=()):
+        """
+        :param latency_seconds: Time every request waits, to simulate the network
+        :param invalid_symbols: Symbols without any data
+        """
+        self.latency_seconds = latency_seconds
+        self.invalid_symbols = set(invalid_symbols)
+        self.requests = 0
+        self.originals = None
+
+    def get_bars(self, symbol, start=None, end=None, period=None, interval='5m'):
+        """
+        Get the bars of the symbol for the range, like a yfinance request
+        """
+        self.requests += 1
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        if symbol in self.invalid_symbols:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'])
+
+        interval_minutes = int(interval.rstrip('m')) if interval.endswith('m') else 5
+        today = datetime.date.today()
+        if period is not None:
+            sessions = pd.bdate_range(end=today, periods=int(period.rstrip('d')))
+        else:
+            start_day = pd.Timestamp(start).date() if start is not None else today - datetime.timedelta(days=30)
+            end_day = pd.Timestamp(end).date() if end is not None else today + datetime.timedelta(days=1)
+            sessions = pd.bdate_range(start_day, end_day - datetime.timedelta(days=1))
+        if len(sessions) == 0:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'])
+        bars = pd.concat([make_session_bars(symbol, session.date(), interval_minutes) for session in sessions])
+        if start is not None and not isinstance(start, str):
+            start = pd.Timestamp(start)
+            bars = bars[bars.index >= (start if start.tzinfo is not None else start.tz_localize('America/New_York'))]
+        return bars
+
+    def download(self, tickers, start=None, end=None, interval='1d', group_by='column', period=None, **kwargs):
+        """
+        Stand-in for yf.download
+        """
+        symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {symbol: self.get_bars(symbol, start, end, period, interval) for symbol in symbols}
+        if len(symbols) == 1:
+            return frames[symbols[0]]
+        return pd.concat({symbol.upper(): frame for symbol, frame in frames.items()}, axis=1)
+
+    def ticker(self, symbol, *args, **kwargs):
+        """
+        Stand-in for yf.Ticker
+        """
+        fake = self
+
+        class FakeTicker:
+            def __init__(self):
+                self.ticker = symbol
+
+            def history(self, start=None, end=None, period=None, interval='1d', **kwargs):
+                return fake.get_bars(symbol, start, end, period, interval)
+
+            @property
+            def info(self):
+                return {} if symbol in fake.invalid_symbols else {"symbol": symbol, "quoteType": "EQUITY"}
+
+        return FakeTicker()
+
+    def install(self):
+        """
+        Replace yf.download and yf.Ticker with the stand-in
+        """
+        if self.originals is None:
+            self.originals = (yf.download, yf.Ticker)
+            yf.download = self.download
+            yf.Ticker = self.ticker
+        return self
+
+    def uninstall(self):
+        """
+        Restore yf.download and yf.Ticker
+        """
+        if self.originals is not None:
+            yf.download, yf.Ticker = self.originals
+            self.originals = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *args):
+        self.uninstall()
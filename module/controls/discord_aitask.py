@@ -6,7 +6,11 @@ from discord.ext import tasks, commands
 from datetime import datetime
 from pytz import timezone
 
-from module.trade.ticker_ai import TickerAI
+from module.flow.ai_service import AIService
+
+AI_CONCURRENCY = int(os.getenv('AI_CONCURRENCY', 2))
+AI_QUEUE_SIZE = int(os.getenv('AI_QUEUE_SIZE', 20))
+AI_TIMEOUT_SECONDS = int(os.getenv('AI_TIMEOUT_SECONDS', 180))
 
 
 #-----------------------------------------------------------
@@ -19,9 +23,12 @@ class AIExecutionTask(commands.Cog):
     def __init__(self, bot, DISCORD_AI_CHANNEL_ID):
         self.bot = bot
         self.DISCORD_AI_CHANNEL_ID = DISCORD_AI_CHANNEL_ID
+        # The questions are answered in threads by one long lived TickerAI, the bot keeps responding meanwhile
+        self.ai_service = AIService(AI_CONCURRENCY, AI_QUEUE_SIZE, AI_TIMEOUT_SECONDS)
+        self.ai_service.start()
 
     async def cog_unload(self):
-        pass
+        await self.ai_service.stop()
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -34,12 +41,14 @@ class AIExecutionTask(commands.Cog):
 
         if self.bot.user.mentioned_in(message):
             try:
-                print("Question: ", message.content)          
-                ticker_ai = TickerAI()
-                response = ticker_ai.chat(message.content)
+                print("Question: ", message.content)
+                async with message.channel.typing():
+                    response = await self.ai_service.ask(message.content)
                 await message.channel.send(response)
 
+            except asyncio.QueueFull:
+                await message.channel.send("I am answering too many questions right now, please ask again in a minute.")
+
             except Exception as e:
                 print(f"Error: {e}")
                 await message.channel.send("I am sorry, I am unable to answer that question at the moment.")
-
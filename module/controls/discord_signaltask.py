@@ -1,16 +1,48 @@
 import asyncio
 import os
+import io
+import csv
 import discord
 from discord.ext import tasks, commands
 
 from datetime import datetime
-from pytz import timezone
 
 from module.flow.generate_indicator import GenerateIndicator
+from module.flow.bar_scheduler import BarScheduler
+from module.controls.publish_queue import PublishQueue
+from module.controls.metrics_server import MetricsServer
 
 DATA_RANAGE_DAYS = int(os.getenv('DATA_RANAGE_DAYS'))
 DATA_INTERVAL_MINUTES = int(os.getenv('DATA_INTERVAL_MINUTES'))
-LOOP_INTERVAL_SECONDS = int(os.getenv('LOOP_INTERVAL_SECONDS'))
+BAR_SETTLE_SECONDS = int(os.getenv('BAR_SETTLE_SECONDS', 5))
+SCAN_SHARDS = int(os.getenv('SCAN_SHARDS', 1))
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+DATA_BATCH_SIZE = int(os.getenv('DATA_BATCH_SIZE', 50))
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', 0))
+PLOT_PROFILE = os.getenv('PLOT_PROFILE', 'default')
+CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', 128))
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', 8))
+FETCH_TIMEOUT_SECONDS = int(os.getenv('FETCH_TIMEOUT_SECONDS', 60))
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', 0))
+
+# Maximum length of a Discord message
+MESSAGE_LIMIT = 2000
+
+def parse_symbols(text):
+    """
+    Parse the symbols from the command arguments or a CSV file
+    The symbols can be separated by commas, spaces or new lines, for a CSV file with a header the Symbol (or Ticker) column is used
+    :param text: Text to parse
+    :return: List of symbols
+    """
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    if len(rows) > 0:
+        header = [cell.strip().lower() for cell in rows[0]]
+        for name in ('symbol', 'ticker'):
+            if name in header:
+                column = header.index(name)
+                return [row[column].strip() for row in rows[1:] if len(row) > column and row[column].strip()]
+    return [token for row in rows for cell in row for token in cell.split()]
 
 #-----------------------------------------------------------
 #----------------- Discord Signal Task Class ---------------
@@ -22,14 +54,37 @@ class SignalExecutionTask(commands.Cog):
         self.lock = asyncio.Lock()
         self.gi = GenerateIndicator(
             DATA_RANAGE_DAYS,
-            DATA_INTERVAL_MINUTES
+            DATA_INTERVAL_MINUTES,
+            DATA_BATCH_SIZE,
+            RENDER_WORKERS,
+            PLOT_PROFILE,
+            CHART_CACHE_SIZE,
+            FETCH_CONCURRENCY,
+            FETCH_TIMEOUT_SECONDS,
+            PROFILE_CYCLES
         )
+        self.publish_queue = PublishQueue(bot, signal_channel_id)
+        self.publish_queue.start()
+        self.scheduler = BarScheduler(DATA_INTERVAL_MINUTES, BAR_SETTLE_SECONDS, shard_count=SCAN_SHARDS)
+        # Local Prometheus endpoint, disabled when no port is set
+        self.metrics_server = MetricsServer(METRICS_PORT) if METRICS_PORT > 0 else None
         self.signal_executor.start()
         self.status.start()
 
+    async def cog_load(self):
+        if self.metrics_server is not None:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                print(f"Failed to start the metrics endpoint: {e}")
+
     async def cog_unload(self):
         self.signal_executor.cancel()
         self.status.cancel()
+        self.gi.shutdown()
+        await self.publish_queue.stop()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
 
     async def execute_signal(self):
         print("***Executing signal Task***")
@@ -38,15 +93,14 @@ class SignalExecutionTask(commands.Cog):
     #---------------------------------------------
     #-------- Signal Executor Task Loop ----------
     #---------------------------------------------
-    @tasks.loop(seconds=LOOP_INTERVAL_SECONDS)
+    @tasks.loop(seconds=0)
     async def signal_executor(self):
+        # Wait for the next shard scan after a bar close of a trading session, the nights, weekends and holidays are skipped
+        next_run, bar_index, shard = self.scheduler.get_next_slot()
+        print(f"Next signal execution at {next_run} (shard {shard + 1}/{SCAN_SHARDS})")
+        await asyncio.sleep(max(0.0, (next_run - datetime.now(next_run.tzinfo)).total_seconds()))
         async with self.lock:
-            #Find if the current time is between 9AM Eastern to 5PM Eastern
-            current_time = datetime.now(timezone('US/Eastern'))
-            if current_time.hour < 9 or current_time.hour > 24:
-                print(f"Current time {current_time} is outside of trading hours. Skipping signal execution.")
-            else:
-                await self.gi.execute_gi(self.publish_signal)
+            await self.gi.execute_gi(self.publish_signal, bar_index, shard, SCAN_SHARDS)
 
     @signal_executor.before_loop
     async def before_signal_executor(self):
@@ -60,25 +114,8 @@ class SignalExecutionTask(commands.Cog):
             print("Signal Executor Task Loop is completed.")
 
     async def publish_signal(self, signal, buf=None):
-        print(f"Publishing Signal:")
-        try:
-            embed = discord.Embed(
-                title=f"{signal['symbol']} : {signal['name']}",
-                description=signal["message"],
-                color=discord.Color.blue()
-            )
-
-            if buf is not None:
-                # Send the image through Discord in an embed
-                file = discord.File(buf, filename="plot.png")
-                embed.set_image(url="attachment://plot.png")  # Use attachment:// to refer to uploaded files
-
-                # Send the signal and tag everyone
-                await self.bot.get_channel(self.signal_channel_id).send(embed=embed, content="@everyone", file=file)
-            else:
-                await self.bot.get_channel(self.signal_channel_id).send(embed=embed, content="@everyone")
-        except Exception as e:
-            print(f"Failed to publish signal: {e}")
+        # The signal is sent by the background sender of the publish queue, the scan does not wait for Discord
+        self.publish_queue.put(signal, buf)
 
     #---------------------------------------------
     #------------ Signal Task Commands -----------
@@ -95,6 +132,61 @@ class SignalExecutionTask(commands.Cog):
             result = self.gi.remove_symbol(symbol)
             await ctx.reply(f"{result['message']}")
 
+    @commands.command(name='addmany')
+    async def addmany(self, ctx, *symbols: str):
+        symbols = await self.read_symbols(ctx, symbols)
+        if len(symbols) == 0:
+            await ctx.reply("Provide the symbols separated by spaces or commas, or attach a CSV file")
+            return
+        async with self.lock:
+            # Validation waits on the network, it runs in a thread to keep the bot responding
+            result = await asyncio.to_thread(self.gi.add_symbols, symbols)
+        await self.reply_report(ctx, result, "Added", result["added"])
+
+    @commands.command(name='removemany')
+    async def removemany(self, ctx, *symbols: str):
+        symbols = await self.read_symbols(ctx, symbols)
+        if len(symbols) == 0:
+            await ctx.reply("Provide the symbols separated by spaces or commas, or attach a CSV file")
+            return
+        async with self.lock:
+            result = self.gi.remove_symbols(symbols)
+        await self.reply_report(ctx, result, "Removed", result["removed"])
+
+    async def read_symbols(self, ctx, arguments):
+        """
+        Read the symbols from the command arguments and the attached files
+        """
+        symbols = parse_symbols(' '.join(arguments))
+        for attachment in ctx.message.attachments:
+            try:
+                symbols += parse_symbols((await attachment.read()).decode('utf-8-sig'))
+            except Exception as e:
+                print(f"Failed to read the attachment {attachment.filename}: {e}")
+        return symbols
+
+    async def reply_report(self, ctx, result, action, accepted):
+        """
+        Reply with the accepted and rejected symbols of a bulk command in one message,
+        a report longer than a message is attached as a text file
+        """
+        report = f"{result['message']}\n{action}: {', '.join(accepted) if accepted else '-'}"
+        if len(result["rejected"]) > 0:
+            report += "\nRejected: " + ', '.join(f"{symbol} ({reason})" for symbol, reason in result["rejected"].items())
+        if len(report) <= MESSAGE_LIMIT:
+            await ctx.reply(report)
+        else:
+            await ctx.reply(result['message'], file=discord.File(io.BytesIO(report.encode('utf-8')), filename="report.txt"))
+
+    @commands.command(name='priority')
+    async def priority(self, ctx, symbol: str, priority: int = None):
+        async with self.lock:
+            if priority is None:
+                await ctx.reply(f"Ticker {symbol} priority is {self.gi.Ticker_Manager.get_priority(symbol)} (0: every bar right after the close, 1: every bar, N: every N bars)")
+                return
+            result = self.gi.set_priority(symbol, priority)
+            await ctx.reply(f"{result['message']}")
+
     @commands.command(name='list')
     async def list(self, ctx):
         async with self.lock:
@@ -107,6 +199,23 @@ class SignalExecutionTask(commands.Cog):
         async with self.lock:
             await self.gi.excute_gi_ondemand(symbol, self.publish_signal)
 
+    @commands.command(name='health')
+    async def health(self, ctx):
+        summary = self.gi.Metrics.get_summary()
+        # Keep the reply in one message with the code block
+        if len(summary) > MESSAGE_LIMIT - 8:
+            summary = summary[:MESSAGE_LIMIT - 12] + "\n..."
+        await ctx.reply(f"```\n{summary}\n```")
+
+    @commands.command(name='profile')
+    async def profile(self, ctx, cycles: int = 1):
+        # Profile the next scan cycles, 0 cancels the pending profiling
+        self.gi.Profiler.request(cycles)
+        if cycles > 0:
+            await ctx.reply(f"Profiling the next {cycles} scan cycles, the reports are written to {self.gi.Profiler.folder}")
+        else:
+            await ctx.reply("Profiling cancelled")
+
     @tasks.loop(seconds=3600)
     async def status(self):
         await self.bot.get_channel(self.signal_channel_id).send(content="I am still alive!")
\ No newline at end of file
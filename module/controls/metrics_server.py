@@ -0,0 +1,41 @@
+from aiohttp import web
+
+from module.flow.pipeline_metrics import get_pipeline_metrics
+
+#-----------------------------------------------------------
+#----------------- Local Metrics Endpoint ------------------
+#-----------------------------------------------------------
+class MetricsServer:
+    """
+    A class to represent a local HTTP endpoint serving the pipeline metrics in the Prometheus text format (GET /metrics)
+    """
+    def __init__(self, port, host='127.0.0.1'):
+        """
+        :param port: Port of the endpoint
+        :param host: Interface of the endpoint (default: local only)
+        """
+        self.port = port
+        self.host = host
+        self.runner = None
+
+    async def handle_metrics(self, request):
+        return web.Response(text=get_pipeline_metrics().to_prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def start(self):
+        """
+        Start serving the metrics
+        """
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        print(f"Serving the metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        """
+        Stop serving the metrics
+        """
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
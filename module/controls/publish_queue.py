@@ -0,0 +1,163 @@
+import io
+import time
+import asyncio
+import discord
+
+from module.flow.pipeline_metrics import get_pipeline_metrics
+
+# Discord limits of a message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_FILES_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS_PER_MESSAGE = 6000
+# Number of attempts to send a message before it is dropped
+MAX_SEND_ATTEMPTS = 5
+
+#-----------------------------------------------------------
+#----------------- Discord Publish Queue -------------------
+#-----------------------------------------------------------
+class PublishQueue:
+    """
+    A class to represent the queue of the signals to publish in the signal channel
+    The scan only adds the signals to the queue, a background sender groups the pending signals
+    into messages of several embeds and waits when Discord reports a rate limit
+    """
+    def __init__(self, bot, channel_id, batch_delay_seconds=1.0):
+        """
+        :param bot: Discord bot
+        :param channel_id: Channel where the signals are published
+        :param batch_delay_seconds: Time waited after the first signal for more signals to send in the same message
+        """
+        self.bot = bot
+        self.channel_id = channel_id
+        self.batch_delay_seconds = batch_delay_seconds
+        self.queue = asyncio.Queue()
+        self.sender = None
+        # Signal taken from the queue which did not fit in the previous message
+        self.pending = None
+        self.metrics = get_pipeline_metrics()
+
+    def start(self):
+        """
+        Start the background sender
+        """
+        if self.sender is None:
+            self.sender = asyncio.create_task(self.__send_loop())
+
+    async def stop(self, timeout_seconds=10):
+        """
+        Send the pending signals and stop the background sender
+        :param timeout_seconds: Maximum time to wait for the pending signals
+        """
+        if self.sender is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            print(f"Dropping {self.queue.qsize()} signals not published before stopping")
+        self.sender.cancel()
+        self.sender = None
+
+    def put(self, signal, buf=None):
+        """
+        Add a signal to the queue
+        :param signal: Signal with the symbol, name and message
+        :param buf: Plot image (BytesIO), None if the signal has no plot
+        """
+        png = buf.getvalue() if buf is not None else None
+        self.queue.put_nowait((signal, png))
+        self.metrics.set_gauge("publish_queue_depth", self.queue.qsize())
+
+    def __get_batch(self, first):
+        """
+        Get the pending signals which fit with the first one in one message
+        """
+        batch = [first]
+        characters = self.__get_characters(first[0])
+        while len(batch) < min(MAX_EMBEDS_PER_MESSAGE, MAX_FILES_PER_MESSAGE) and not self.queue.empty():
+            item = self.queue.get_nowait()
+            if characters + self.__get_characters(item[0]) > MAX_EMBED_CHARACTERS_PER_MESSAGE:
+                self.pending = item
+                break
+            batch.append(item)
+            characters += self.__get_characters(item[0])
+        return batch
+
+    def __get_characters(self, signal):
+        """
+        Get the number of characters of the signal embed
+        """
+        return len(f"{signal['symbol']} : {signal['name']}") + len(signal["message"])
+
+    def __create_message(self, batch):
+        """
+        Create the embeds and files of a message, the files are created again for every attempt
+        """
+        embeds = []
+        files = []
+        for i, (signal, png) in enumerate(batch):
+            embed = discord.Embed(
+                title=f"{signal['symbol']} : {signal['name']}",
+                description=signal["message"],
+                color=discord.Color.blue()
+            )
+            if png is not None:
+                # Use attachment:// to refer to uploaded files
+                files.append(discord.File(io.BytesIO(png), filename=f"plot{i}.png"))
+                embed.set_image(url=f"attachment://plot{i}.png")
+            embeds.append(embed)
+        return embeds, files
+
+    async def __send(self, batch):
+        """
+        Send a batch of signals in one message, retrying after the rate limit reported by Discord
+        """
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            embeds, files = self.__create_message(batch)
+            try:
+                # Send the signals and tag everyone
+                await self.bot.get_channel(self.channel_id).send(content="@everyone", embeds=embeds, files=files)
+                return
+            except discord.RateLimited as e:
+                self.metrics.increment("publish_rate_limits")
+                print(f"Rate limited while publishing signals, retrying in {e.retry_after} seconds")
+                await asyncio.sleep(e.retry_after)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.metrics.increment("publish_rate_limits")
+                    retry_after = float(e.response.headers.get('Retry-After', 2 ** attempt))
+                    print(f"Rate limited while publishing signals, retrying in {retry_after} seconds")
+                    await asyncio.sleep(retry_after)
+                elif e.status >= 500:
+                    await asyncio.sleep(2 ** attempt)
+                else:
+                    print(f"Failed to publish signals: {e}")
+                    self.metrics.record_error("publish", error=e)
+                    return
+            except Exception as e:
+                print(f"Failed to publish signals: {e}")
+                self.metrics.record_error("publish", error=e)
+                return
+        print(f"Failed to publish {len(batch)} signals after {MAX_SEND_ATTEMPTS} attempts")
+        self.metrics.record_error("publish", error="too many attempts")
+
+    async def __send_loop(self):
+        """
+        Send the queued signals, a message is sent shortly after a signal is queued with the signals pending at that time
+        """
+        while True:
+            if self.pending is not None:
+                first, self.pending = self.pending, None
+            else:
+                first = await self.queue.get()
+                await asyncio.sleep(self.batch_delay_seconds)
+            batch = self.__get_batch(first)
+            print(f"Publishing {len(batch)} signals")
+            try:
+                # Time from the first attempt until Discord accepts the message, with the rate limit waits
+                start = time.perf_counter()
+                await self.__send(batch)
+                self.metrics.observe("publish", time.perf_counter() - start)
+                self.metrics.set_gauge("publish_queue_depth", self.queue.qsize())
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from module.trade.ticker_ai import TickerAI
+from module.trade.ai_cache import normalize_question
+
+
+class AIService:
+    """
+    A class to represent a long lived TickerAI answering the questions outside of the event loop
+    One TickerAI (and its LLM client) is reused for all the questions. The questions wait in a bounded queue
+    and a limited number of workers answer them in a thread pool. A question asked again while the same
+    question is still waiting or being answered gets the answer of the first one
+    """
+    def __init__(self, max_concurrency=2, max_queue_size=20, timeout_seconds=180, ticker_ai=None):
+        """
+        :param max_concurrency: Maximum number of questions answered at the same time
+        :param max_queue_size: Maximum number of questions waiting, the new questions are refused when the queue is full
+        :param timeout_seconds: Time after which a question is reported as failed
+        :param ticker_ai: TickerAI answering the questions (default: a new TickerAI)
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.ticker_ai = ticker_ai if ticker_ai is not None else TickerAI()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ai")
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        # question key: future of the answer
+        self.in_flight = {}
+        self.workers = []
+
+    def start(self):
+        """
+        Start the workers, must be called from the event loop
+        """
+        if len(self.workers) == 0:
+            self.workers = [asyncio.create_task(self.__worker()) for _ in range(self.max_concurrency)]
+
+    async def stop(self):
+        """
+        Stop the workers, the waiting questions are cancelled
+        """
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        for future in self.in_flight.values():
+            if not future.done():
+                future.cancel()
+        self.in_flight.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def ask(self, question):
+        """
+        Answer a question
+        :param question: Question of the user
+        :return: Answer of the TickerAI
+        :raises asyncio.QueueFull: If too many questions are waiting
+        :raises asyncio.TimeoutError: If the question is not answered in time
+        """
+        key = normalize_question(question)
+        future = self.in_flight.get(key, None)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait((key, question, future))
+            self.in_flight[key] = future
+        else:
+            print(f"Question already in flight: {key}")
+        # Shielded so that a cancelled caller does not cancel the answer of the other callers
+        return await asyncio.shield(future)
+
+    async def __worker(self):
+        """
+        Answer the questions of the queue one after another
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            key, question, future = await self.queue.get()
+            try:
+                # A timed out question keeps its thread until it returns, the pool still bounds the new ones
+                answer = await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, functools.partial(self.ticker_ai.chat, question)),
+                    timeout=self.timeout_seconds
+                )
+                if not future.done():
+                    future.set_result(answer)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                if self.in_flight.get(key, None) is future:
+                    del self.in_flight[key]
+                self.queue.task_done()
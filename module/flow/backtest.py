@@ -0,0 +1,141 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from module.trade.ticker import SimTicker
+from module.trade.bar_store import BarStore
+from module.trade.indicator.signal_satypivotribbon import SignalSatypePivotRibbon
+
+#-----------------------------------------------------------
+# Backtest of a signal over the stored bars of many symbols
+# Run from the repository root: python -m module.flow.backtest SPY AAPL --start 2024-01-01
+#-----------------------------------------------------------
+
+def get_trades(transitions, last_close, last_timestamp):
+    """
+    Turn the signals of a symbol into trades, every signal opens a position in its direction (Buy: long, Sell: short)
+    which is closed by the next signal, the last position is closed at the last close
+    :param transitions: DataFrame returned by SignalBase.compute_history
+    :param last_close: Close of the last bar
+    :param last_timestamp: Timestamp of the last bar
+    :return: DataFrame of the trades with the entry, exit and return
+    """
+    entry_price = transitions['price']
+    exit_price = entry_price.shift(-1).fillna(last_close)
+    direction = np.where(transitions['kind'] == "Buy", 1.0, -1.0)
+    return pd.DataFrame({
+        "entry_time": transitions['Datetime'],
+        "exit_time": transitions['Datetime'].shift(-1).fillna(last_timestamp),
+        "kind": transitions['kind'],
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "return": direction * (exit_price / entry_price - 1.0),
+        "closed": np.arange(len(transitions)) < len(transitions) - 1,
+    })
+
+
+def get_statistics(returns):
+    """
+    Get the P&L and hit rate statistics of the trades
+    :param returns: Array of the returns of the trades
+    :return: Dictionary of the statistics
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    return {
+        "trades": len(returns),
+        "hit_rate": float((returns > 0).mean()) if len(returns) > 0 else np.nan,
+        "total_return": float(returns.sum()),
+        "average_return": float(returns.mean()) if len(returns) > 0 else np.nan,
+        "compounded_return": float(np.prod(1.0 + returns) - 1.0),
+    }
+
+
+def backtest_symbol(signal, symbol, start_date, end_date, interval, timezone, bar_store_folder):
+    """
+    Backtest the signal over the stored bars of a symbol, runs in a backtest process
+    :return: Dictionary with the symbol, the signals, the trades and the statistics, or the error
+    """
+    try:
+        ticker = SimTicker(symbol, BarStore(bar_store_folder))
+        ticker.load_historical_data(start_date, end_date, interval, timezone)
+        if ticker.historical_data is None or len(ticker.historical_data) == 0:
+            return {"symbol": symbol, "error": "No stored bars"}
+
+        transitions = signal.compute_history(ticker)
+        last_bar = ticker.historical_data.iloc[-1]
+        trades = get_trades(transitions, float(last_bar['Close']), last_bar['Datetime'])
+        return {
+            "symbol": symbol,
+            "bars": len(ticker.historical_data),
+            "transitions": transitions,
+            "trades": trades,
+            "statistics": get_statistics(trades['return']),
+        }
+    except Exception as e:
+        return {"symbol": symbol, "error": str(e)}
+
+
+class Backtest:
+    """
+    A class to represent a backtest of a signal over the stored bars of many symbols
+    Every symbol is evaluated in one vectorized pass over its whole history, the symbols are spread over a pool of processes
+    """
+    def __init__(self, signal=None, max_workers=None, bar_store_folder='.data/bars'):
+        """
+        :param signal: Signal to backtest (default: Saty Pivot Ribbon with the default parameters)
+        :param max_workers: Number of backtest processes (default: number of cores)
+        :param bar_store_folder: Folder of the bar store with the history of the symbols
+        """
+        self.signal = signal if signal is not None else SignalSatypePivotRibbon()
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.bar_store_folder = bar_store_folder
+
+    def run(self, symbols, start_date=None, end_date=None, interval='5m', timezone='America/New_York'):
+        """
+        Backtest the signal for the symbols
+        :param symbols: Symbols with bars in the bar store
+        :param start_date: Start date (YYYY-MM-DD), None for the first stored bar
+        :param end_date: End date (YYYY-MM-DD), None for the last stored bar
+        :return: Dictionary with the signals, the trades, the statistics per symbol, the overall statistics and the errors
+        """
+        arguments = (start_date, end_date, interval, timezone, self.bar_store_folder)
+        if self.max_workers == 1:
+            results = [backtest_symbol(self.signal, symbol, *arguments) for symbol in symbols]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(backtest_symbol, self.signal, symbol, *arguments) for symbol in symbols]
+                results = [future.result() for future in futures]
+
+        errors = {result["symbol"]: result["error"] for result in results if "error" in result}
+        results = [result for result in results if "error" not in result]
+        transitions = pd.concat([result["transitions"].assign(symbol=result["symbol"]) for result in results], ignore_index=True) if results else pd.DataFrame()
+        trades = pd.concat([result["trades"].assign(symbol=result["symbol"]) for result in results], ignore_index=True) if results else pd.DataFrame(columns=['return'])
+        statistics = pd.DataFrame([{"symbol": result["symbol"], "bars": result["bars"], **result["statistics"]} for result in results])
+        return {
+            "transitions": transitions,
+            "trades": trades,
+            "statistics": statistics,
+            "total": get_statistics(trades['return']),
+            "errors": errors,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the Saty Pivot Ribbon signal over the stored bars")
+    parser.add_argument("symbols", nargs="+", help="Symbols with bars in the bar store")
+    parser.add_argument("--start", default=None, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--interval", default="5m", help="Interval of the bars")
+    parser.add_argument("--workers", type=int, default=None, help="Number of backtest processes")
+    parser.add_argument("--output", default=None, help="CSV file for the trades")
+    args = parser.parse_args()
+
+    result = Backtest(max_workers=args.workers).run(args.symbols, args.start, args.end, args.interval)
+    print(result["statistics"].to_string(index=False))
+    print(f"Total: {result['total']}")
+    for symbol, error in result["errors"].items():
+        print(f"Error for {symbol}: {error}")
+    if args.output is not None:
+        result["trades"].to_csv(args.output, index=False)
@@ -0,0 +1,64 @@
+import datetime
+
+from module.flow.market_calendar import MarketCalendar, MARKET_TIMEZONE
+
+class BarScheduler:
+    """
+    A class to represent the schedule of the signal scans
+    A scan runs a few seconds after every bar of the session closes, the time outside of the sessions is skipped.
+    With several shards, the scans of a bar are spread evenly across the bar interval, the first one right after the close.
+    """
+    def __init__(self, data_interval_minutes=5, settle_seconds=5, calendar=None, shard_count=1):
+        """
+        :param data_interval_minutes: Interval in minutes of the bars
+        :param settle_seconds: Delay after the bar close, so that the provider has published the bar
+        :param calendar: Trading calendar (default: NYSE)
+        :param shard_count: Number of scans per bar
+        """
+        self.interval = datetime.timedelta(minutes=data_interval_minutes)
+        self.settle = datetime.timedelta(seconds=settle_seconds)
+        self.calendar = calendar if calendar is not None else MarketCalendar()
+        self.shard_count = max(1, shard_count)
+        self.shard_spacing = self.interval / self.shard_count
+
+    def get_next_bar_close(self, now=None):
+        """
+        Get the close of the next bar after the given time (default: now), the last bar of a session closes with the session
+        :return: Close of the bar (Eastern datetime)
+        """
+        now = now if now is not None else datetime.datetime.now(MARKET_TIMEZONE)
+        # A scan is due until the settle delay after the bar close has passed
+        after = now.astimezone(MARKET_TIMEZONE) - self.settle
+        date = after.date()
+        # Look ahead over weekends and holidays
+        for _ in range(14):
+            session = self.calendar.get_session(date)
+            if session is not None and after < session[1]:
+                open_time, close_time = session
+                if after < open_time:
+                    return min(open_time + self.interval, close_time)
+                bars = (after - open_time) // self.interval + 1
+                return min(open_time + bars * self.interval, close_time)
+            date += datetime.timedelta(days=1)
+        raise ValueError(f"No trading session found after {now}")
+
+    def get_next_run(self, now=None):
+        """
+        Get the time of the next scan, the settle delay after the next bar close
+        :return: Time of the scan (Eastern datetime)
+        """
+        return self.get_next_bar_close(now) + self.settle
+
+    def get_next_slot(self, now=None):
+        """
+        Get the next shard scan after the given time (default: now)
+        :return: Tuple of the time of the scan (Eastern datetime), the bar index (bars since the epoch) and the shard
+        """
+        now = now if now is not None else datetime.datetime.now(MARKET_TIMEZONE)
+        slots = []
+        for shard in range(self.shard_count):
+            bar_close = self.get_next_bar_close(now - shard * self.shard_spacing)
+            slots.append((bar_close + self.settle + shard * self.shard_spacing, bar_close, shard))
+        run_time, bar_close, shard = min(slots)
+        bar_index = int(bar_close.timestamp() // self.interval.total_seconds())
+        return run_time, bar_index, shard
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+
+class ChartCache:
+    """
+    A class to represent a bounded LRU cache of the rendered plots
+    Plots are cached per symbol (case insensitive) and signal together with the timestamp of the last bar they show,
+    so a plot is reused until a new bar arrives for the symbol
+    """
+    def __init__(self, max_entries=128, data_interval_minutes=5):
+        """
+        :param max_entries: Maximum number of plots kept, the least recently used plot is dropped first
+        :param data_interval_minutes: Interval in minutes of the bars
+        """
+        self.max_entries = max_entries
+        self.interval_seconds = data_interval_minutes * 60
+        self.entries = OrderedDict()
+
+    def __get_bar_start(self):
+        """
+        Get the start (epoch seconds) of the bar interval the current time is in
+        """
+        now = int(time.time())
+        return now - now % self.interval_seconds
+
+    def get(self, symbol, signal_key, last_bar_timestamp=None):
+        """
+        Get a cached plot
+        :param symbol: Symbol of the plot
+        :param signal_key: Signal and parameters of the plot
+        :param last_bar_timestamp: Timestamp of the last bar of the current data,
+            None when the data is not fetched, then only a plot rendered during the current bar interval is returned
+        :return: PNG image bytes, None if not cached
+        """
+        key = (symbol.upper(), signal_key)
+        entry = self.entries.get(key, None)
+        if entry is None:
+            return None
+
+        if last_bar_timestamp is not None:
+            if entry["last_bar_timestamp"] != last_bar_timestamp:
+                return None
+        elif entry["rendered_bar_start"] != self.__get_bar_start():
+            return None
+
+        self.entries.move_to_end(key)
+        return entry["png"]
+
+    def put(self, symbol, signal_key, last_bar_timestamp, png):
+        """
+        Cache a rendered plot, it replaces the plot of an older bar
+        """
+        key = (symbol.upper(), signal_key)
+        self.entries[key] = {
+            "last_bar_timestamp": last_bar_timestamp,
+            "rendered_bar_start": self.__get_bar_start(),
+            "png": png,
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, symbol, last_bar_timestamp):
+        """
+        Drop the plots of the symbol which do not show the given last bar
+        :param last_bar_timestamp: Timestamp of the last bar of the new data
+        """
+        symbol = symbol.upper()
+        for key in [key for key in self.entries if key[0] == symbol]:
+            if self.entries[key]["last_bar_timestamp"] != last_bar_timestamp:
+                del self.entries[key]
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+class FetchExecutor:
+    """
+    A class to represent a pool of threads running the blocking data downloads
+    Downloads run outside of the event loop with a limited number in flight and a timeout for every request,
+    so that the network waits of several tickers overlap without freezing the bot.
+    The timeout only counts the time the download runs, not the wait for a free thread or for the exclusive downloads before it
+    """
+    def __init__(self, max_concurrency=8, timeout_seconds=60):
+        """
+        :param max_concurrency: Maximum number of downloads running at the same time
+        :param timeout_seconds: Time after which a download is reported as failed
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fetch")
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Held while an exclusive download runs
+        self.exclusive_lock = asyncio.Lock()
+
+    async def __submit(self, func, *args, **kwargs):
+        """
+        Start a function in a free thread
+        The thread is counted as busy until the function returns, also when the caller stopped waiting for it
+        :return: Future of the result of the function
+        """
+        loop = asyncio.get_running_loop()
+        await self.semaphore.acquire()
+        try:
+            future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        except Exception:
+            self.semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self.semaphore.release())
+        return future
+
+    async def run(self, fetch_func, *args, **kwargs):
+        """
+        Run a blocking download in the thread pool
+        The result of a timed out download is discarded, the function must not change any state (see Ticker.download_historical_data)
+        :param fetch_func: Function doing the download
+        :return: Result of the function
+        :raises asyncio.TimeoutError: If the download does not complete in time
+        """
+        future = await self.__submit(fetch_func, *args, **kwargs)
+        # Shielded so that a timed out download keeps its thread (and the semaphore) until it returns
+        return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout_seconds)
+
+    async def run_exclusive(self, fetch_func, *args, **kwargs):
+        """
+        Run a download which cannot overlap with another exclusive download (e.g. yf.download), one after another
+        The timeout starts when the download starts, a timed out download still blocks the next one until it returns
+        :param fetch_func: Function doing the download
+        :return: Result of the function
+        :raises asyncio.TimeoutError: If the download does not complete in time
+        """
+        await self.exclusive_lock.acquire()
+        try:
+            future = await self.__submit(fetch_func, *args, **kwargs)
+        except BaseException:
+            self.exclusive_lock.release()
+            raise
+        future.add_done_callback(lambda _: self.exclusive_lock.release())
+        return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout_seconds)
+
+    async def run_local(self, func, *args, **kwargs):
+        """
+        Run blocking local work (e.g. merging a download into the bar cache) in the thread pool, without a timeout
+        :return: Result of the function
+        """
+        return await (await self.__submit(func, *args, **kwargs))
+
+    def shutdown(self):
+        """
+        Stop the download threads
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,80 +1,252 @@
 import datetime
 import asyncio
 import time
+import io
 
 from module.trade.ticker import TickerManager
 from module.trade.indicator.signal_satypivotribbon import SignalSatypePivotRibbon
 
 from module.trade.ticker import Ticker
+from module.flow.fetch_executor import FetchExecutor
+from module.flow.render_executor import RenderExecutor
+from module.flow.chart_cache import ChartCache
+from module.flow.pipeline_metrics import get_pipeline_metrics
+from module.flow.scan_profiler import ScanProfiler
 
 class GenerateIndicator:
-    def __init__(self, data_range_days=10, data_interval_minutes=5):
+    def __init__(self, data_range_days=10, data_interval_minutes=5, batch_size=0, render_workers=None, plot_profile="default", chart_cache_size=128, fetch_concurrency=8, fetch_timeout_seconds=60, profile_cycles=0):
         """
         Initialize the generate indicator flow
         :param data_range_days: Number of days to get the historical data
         :param data_interval_minutes: Interval in minutes for the historical data
+        :param batch_size: Number of tickers downloaded together in one request (0 downloads each ticker separately)
+        :param render_workers: Number of processes rendering the plots (default: number of cores)
+        :param plot_profile: Output profile of the plots (see PLOT_PROFILES)
+        :param chart_cache_size: Number of rendered plots kept for reuse
+        :param fetch_concurrency: Maximum number of downloads running at the same time
+        :param fetch_timeout_seconds: Time after which a download is reported as failed
+        :param profile_cycles: Number of the first scan cycles profiled (see ScanProfiler)
         """
         self.Ticker_Manager = TickerManager()
         self.Signal_List = [
-            SignalSatypePivotRibbon()
+            SignalSatypePivotRibbon(plot_profile=plot_profile)
         ]
         self.data_range_days = data_range_days
         self.data_interval_minutes = data_interval_minutes
+        self.batch_size = batch_size
+        self.Fetch_Executor = FetchExecutor(fetch_concurrency, fetch_timeout_seconds)
+        self.Render_Executor = RenderExecutor(render_workers)
+        self.Chart_Cache = ChartCache(chart_cache_size, data_interval_minutes)
+        self.Metrics = get_pipeline_metrics()
+        self.Profiler = ScanProfiler(profile_cycles)
 
-    async def execute_gi_single_ticker(self, ticker_obj, publish_signal_func=None):
+    def get_data_range(self):
         """
-        Execute the generate indicator flow for a single ticker
+        Get the start date, end date and interval for the historical data
         """
-        # Get the start and end date for the historical data
         today = datetime.date.today()
         start_date = (today - datetime.timedelta(days=self.data_range_days)).strftime('%Y-%m-%d')
         end_date = (today + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
         interval = f"{self.data_interval_minutes}m"
+        return start_date, end_date, interval
 
+    async def execute_signals(self, ticker_obj, publish_signal_func=None):
+        """
+        Execute all the signals for a ticker whose historical data is already fetched
+        """
         ticker = ticker_obj.symbol
 
         try:
-            print(f"Getting historical data for {ticker}")
-
-            ticker_obj.get_historical_data(
-                start_date=start_date,
-                end_date=end_date,
-                interval=interval,
-                timezone='America/New_York'
-                )
+            # Drop the cached plots of the ticker which do not show the latest bar
+            self.Chart_Cache.invalidate(ticker, ticker_obj.get_last_timestamp())
 
             # Execute the signals for the ticker
             for signal in self.Signal_List:
                 print(f"Executing signal: {signal.signal_name} for {ticker}")
-                result = signal.compute(ticker_obj)
+                with self.Metrics.time("signal", ticker):
+                    result = signal.compute(ticker_obj)
                 if result['signal']:
                     print(result)
-                    plot = signal.compute_and_plot(ticker_obj)
-                    plot = plot["buf"]
+                    self.Metrics.increment("signals")
+                    plot = await self.render_plot(signal, ticker_obj)
                     if publish_signal_func is not None:
                         await publish_signal_func(result, buf=plot)
         except Exception as e:
-            print(f"Error getting historical data, executing the signal or publishing results for {ticker}: {e}")
+            print(f"Error executing the signal or publishing results for {ticker}: {e}")
+
+    async def render_plot(self, signal, ticker_obj):
+        """
+        Render the plot of the signal for the ticker in the rendering processes
+        The plot is reused from the chart cache while the ticker has no new bar
+        :return: BytesIO with the PNG image
+        """
+        last_bar_timestamp = ticker_obj.get_last_timestamp()
+        png = self.Chart_Cache.get(ticker_obj.symbol, signal.get_plot_key(), last_bar_timestamp)
+        if png is None:
+            self.Metrics.increment("chart_cache_misses")
+            with self.Metrics.time("render", ticker_obj.symbol):
+                plot_data = signal.get_plot_data(ticker_obj)
+                png = await self.Render_Executor.render(signal.render_plot, plot_data)
+            self.Chart_Cache.put(ticker_obj.symbol, signal.get_plot_key(), last_bar_timestamp, png)
+        else:
+            self.Metrics.increment("chart_cache_hits")
+        return io.BytesIO(png)
+
+    async def execute_gi_single_ticker(self, ticker_obj, publish_signal_func=None):
+        """
+        Execute the generate indicator flow for a single ticker
+        """
+        # Get the start and end date for the historical data
+        start_date, end_date, interval = self.get_data_range()
+
+        ticker = ticker_obj.symbol
+        self.Metrics.record_run(ticker)
+
+        try:
+            print(f"Getting historical data for {ticker}")
+
+            # The download is measured in the fetch thread, without the wait for a free thread
+            # The ticker is only updated once the download is complete, a timed out download changes nothing
+            stock_data = await self.Fetch_Executor.run(
+                self.Metrics.timed("fetch", ticker_obj.download_historical_data, ticker),
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                timezone='America/New_York'
+                )
+            await self.Fetch_Executor.run_local(
+                ticker_obj.update_historical_data,
+                stock_data,
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                timezone='America/New_York'
+                )
+        except asyncio.TimeoutError:
+            print(f"Error getting historical data for {ticker}: timed out after {self.Fetch_Executor.timeout_seconds} seconds")
+            self.Metrics.record_error("fetch", ticker, "timed out")
+            return
+        except Exception as e:
+            print(f"Error getting historical data for {ticker}: {e}")
+            return
+
+        await self.execute_signals(ticker_obj, publish_signal_func)
 
-    async def execute_gi(self, publish_signal_func=None):
+    async def execute_gi_batch(self, symbols, publish_signal_func=None):
+        """
+        Execute the generate indicator flow for a group of tickers downloaded together
+        """
+        start_date, end_date, interval = self.get_data_range()
+
+        print(f"Getting historical data for {len(symbols)} tickers: {', '.join(symbols)}")
+        for symbol in symbols:
+            self.Metrics.record_run(symbol)
+        try:
+            # Grouped downloads run one after another, the timeout of a group starts when its download starts
+            downloads, failed = await self.Fetch_Executor.run_exclusive(
+                self.Metrics.timed("fetch", self.Ticker_Manager.download_batch_historical_data),
+                symbols,
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                timezone='America/New_York'
+                )
+            # The tickers are only updated once the download is complete, a timed out download changes nothing
+            failed.update(await self.Fetch_Executor.run_local(
+                self.Ticker_Manager.update_batch_historical_data,
+                downloads,
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                timezone='America/New_York'
+                ))
+        except asyncio.TimeoutError:
+            failed = {symbol: f"timed out after {self.Fetch_Executor.timeout_seconds} seconds" for symbol in symbols}
+        for symbol, reason in failed.items():
+            print(f"Error getting historical data for {symbol}: {reason}")
+            self.Metrics.record_error("fetch", symbol, reason)
+
+        # Execute the signals of the group together, so that their plots render in parallel
+        await asyncio.gather(*[
+            self.execute_signals(self.Ticker_Manager.get_ticker(symbol), publish_signal_func)
+            for symbol in symbols if symbol not in failed
+        ])
+
+    async def execute_gi(self, publish_signal_func=None, bar_index=0, shard=0, shard_count=1):
         """
         Execute the generate indicator flow
+        :param bar_index: Number of the bar, selects the lower priority tickers scanned on this bar
+        :param shard: Shard of the watchlist to scan (see TickerManager.get_scan_symbols)
+        :param shard_count: Number of shards of the watchlist, 1 scans all the tickers due on the bar
+        """
+        if self.Profiler.remaining > 0:
+            return await self.Profiler.profile(
+                self.execute_gi_cycle(publish_signal_func, bar_index, shard, shard_count),
+                f"bar{bar_index}_shard{shard + 1}of{shard_count}",
+                self.Metrics
+            )
+        return await self.execute_gi_cycle(publish_signal_func, bar_index, shard, shard_count)
+
+    async def execute_gi_cycle(self, publish_signal_func=None, bar_index=0, shard=0, shard_count=1):
+        """
+        Execute one scan cycle of the generate indicator flow (see execute_gi)
+        :return: Number of scanned tickers
         """
-        self.Ticker_Manager.sync_tickers()
+        cycle_start = time.perf_counter()
+        with self.Metrics.time("sync"):
+            self.Ticker_Manager.sync_tickers()
         # for each ticker in the ticker manager, get the historical data
-        print("Executing signals: All Started")
+        print(f"Executing signals: Shard {shard + 1}/{shard_count} Started")
 
-        # Get the historical data for each ticker
-        for ticker in self.Ticker_Manager.get_all_tickers():
-            ticker_obj = self.Ticker_Manager.get_all_tickers()[ticker]
-            await self.execute_gi_single_ticker(ticker_obj, publish_signal_func)
+        # The downloads run in the fetch threads, the signals of a ticker are executed as soon as its data arrives
+        all_tickers = self.Ticker_Manager.get_scan_symbols(bar_index, shard, shard_count)
+        if self.batch_size > 0:
+            # Download the tickers in groups of batch size
+            await asyncio.gather(*[
+                self.execute_gi_batch(all_tickers[i:i + self.batch_size], publish_signal_func)
+                for i in range(0, len(all_tickers), self.batch_size)
+            ])
+        else:
+            # Get the historical data for each ticker
+            await asyncio.gather(*[
+                self.execute_gi_single_ticker(self.Ticker_Manager.get_ticker(ticker), publish_signal_func)
+                for ticker in all_tickers
+            ])
+
+        # Save the signal states changed during this cycle in one transaction
+        for signal in self.Signal_List:
+            signal.state_store.flush()
+
+        self.Metrics.observe("cycle", time.perf_counter() - cycle_start)
+        self.Metrics.increment("cycles")
+        self.Metrics.set_gauge("watchlist_size", len(self.Ticker_Manager.ticker_list))
+        self.Metrics.set_gauge("chart_cache_entries", len(self.Chart_Cache.entries))
+        self.Metrics.set_gauge("last_cycle_end", time.time())
 
-        print("Executing signals: All Completed")
+        print(f"Executing signals: Shard {shard + 1}/{shard_count} Completed ({len(all_tickers)} tickers)")
+        return len(all_tickers)
     
     async def excute_gi_ondemand(self, symbol, publish_signal_func=None):
         """
         Execute the generate indicator flow for a single ticker
         """
+        # Symbols are looked up as the scan stores them, the user may type them in any case
+        symbol = symbol.strip().upper()
+
+        # Plots rendered during the current bar interval are published without fetching the data again
+        cached_plots = [self.Chart_Cache.get(symbol, signal.get_plot_key()) for signal in self.Signal_List]
+        if None not in cached_plots:
+            print(f"Publishing cached plots for {symbol}")
+            for signal, png in zip(self.Signal_List, cached_plots):
+                if publish_signal_func is not None:
+                    await publish_signal_func({
+                        "symbol": symbol,
+                        "name": signal.signal_name,
+                        "message": "",
+                        "signal": False
+                    }, buf=io.BytesIO(png))
+            return
+
         if Ticker.is_valid_symbol(symbol) is False:
             print(f"Invalid symbol: {symbol}")
             await publish_signal_func({
@@ -84,18 +256,24 @@ class GenerateIndicator:
                 "signal": False
             })
         else:
-            ticker_obj = Ticker(symbol=symbol)
-            today = datetime.date.today()
-            start_date = (today - datetime.timedelta(days=self.data_range_days)).strftime('%Y-%m-%d')
-            end_date = (today + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
-            interval = f"{self.data_interval_minutes}m"
+            ticker_obj = Ticker(symbol=symbol, bar_cache=self.Ticker_Manager.bar_cache)
+            start_date, end_date, interval = self.get_data_range()
 
             ticker = ticker_obj.symbol
 
             try:
                 print(f"Getting historical data for {ticker}")
 
-                ticker_obj.get_historical_data(
+                stock_data = await self.Fetch_Executor.run(
+                    ticker_obj.download_historical_data,
+                    start_date=start_date,
+                    end_date=end_date,
+                    interval=interval,
+                    timezone='America/New_York'
+                    )
+                await self.Fetch_Executor.run_local(
+                    ticker_obj.update_historical_data,
+                    stock_data,
                     start_date=start_date,
                     end_date=end_date,
                     interval=interval,
@@ -112,13 +290,21 @@ class GenerateIndicator:
                         "signal": False
                     }
                     print(result)
-                    plot = signal.compute_and_plot(ticker_obj)
-                    plot = plot["buf"]
+                    plot = await self.render_plot(signal, ticker_obj)
                     if publish_signal_func is not None:
                         await publish_signal_func(result, buf=plot)
             except Exception as e:
                 print(f"Error getting historical data, executing the signal or publishing results for {ticker}: {e}")
 
+    def shutdown(self):
+        """
+        Stop the download threads and the rendering processes
+        """
+        for signal in self.Signal_List:
+            signal.state_store.flush()
+        self.Fetch_Executor.shutdown()
+        self.Render_Executor.shutdown()
+
     def add_symbol(self, symbol):
         """
         Add a symbol to the ticker manager
@@ -133,6 +319,28 @@ class GenerateIndicator:
         """
         return self.Ticker_Manager.lazy_remove_ticker(symbol)
     
+    def add_symbols(self, symbols):
+        """
+        Add many symbols to the ticker manager
+        :param symbols: Symbols to add
+        """
+        return self.Ticker_Manager.lazy_add_tickers(symbols)
+
+    def remove_symbols(self, symbols):
+        """
+        Remove many symbols from the ticker manager
+        :param symbols: Symbols to remove
+        """
+        return self.Ticker_Manager.lazy_remove_tickers(symbols)
+
+    def set_priority(self, symbol, priority):
+        """
+        Set the scan priority of a symbol
+        :param symbol: Symbol of the ticker
+        :param priority: 0 scans every bar right after the close, 1 scans every bar, N scans every N bars
+        """
+        return self.Ticker_Manager.lazy_set_priority(symbol, priority)
+
     def get_all_symbols(self):
         """
         Get all the symbols in the ticker manager
@@ -0,0 +1,119 @@
+import datetime
+from pytz import timezone
+
+# -----------------------------------------------------------
+# Local NYSE trading calendar, no network call is needed
+# - Regular session 9:30 to 16:00 Eastern on weekdays
+# - Full day holidays, a Saturday holiday is observed on Friday and a Sunday holiday on Monday
+#   (except New Year's Day on a Saturday, which is not observed)
+# - Early close at 13:00 Eastern on July 3rd, the day after Thanksgiving and Christmas Eve
+# -----------------------------------------------------------
+MARKET_TIMEZONE = timezone('America/New_York')
+SESSION_OPEN = datetime.time(9, 30)
+SESSION_CLOSE = datetime.time(16, 0)
+EARLY_CLOSE = datetime.time(13, 0)
+
+
+def nth_weekday(year, month, weekday, n):
+    """
+    Get the nth weekday (Monday = 0) of the month, a negative n counts from the end of the month
+    """
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+
+def easter(year):
+    """
+    Get the date of Easter Sunday (anonymous Gregorian algorithm)
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def observed(date):
+    """
+    Get the weekday on which a fixed date holiday is observed
+    """
+    if date.weekday() == 5:
+        return date - datetime.timedelta(days=1)
+    if date.weekday() == 6:
+        return date + datetime.timedelta(days=1)
+    return date
+
+
+class MarketCalendar:
+    """
+    A class to represent the NYSE trading calendar
+    """
+    def __init__(self):
+        # year: (holidays, early closes)
+        self.years = {}
+
+    def __get_year(self, year):
+        """
+        Get the holidays and the early closes of the year, computed on the first use
+        """
+        if year not in self.years:
+            holidays = {
+                nth_weekday(year, 1, 0, 3),                    # Martin Luther King Jr. Day
+                nth_weekday(year, 2, 0, 3),                    # Washington's Birthday
+                easter(year) - datetime.timedelta(days=2),     # Good Friday
+                nth_weekday(year, 5, 0, -1),                   # Memorial Day
+                observed(datetime.date(year, 7, 4)),           # Independence Day
+                nth_weekday(year, 9, 0, 1),                    # Labor Day
+                nth_weekday(year, 11, 3, 4),                   # Thanksgiving Day
+                observed(datetime.date(year, 12, 25)),         # Christmas Day
+            }
+            new_year = datetime.date(year, 1, 1)
+            if new_year.weekday() != 5:
+                holidays.add(observed(new_year))               # New Year's Day
+            if year >= 2022:
+                holidays.add(observed(datetime.date(year, 6, 19)))  # Juneteenth
+
+            early_closes = {
+                datetime.date(year, 7, 3),                                      # Day before Independence Day
+                nth_weekday(year, 11, 3, 4) + datetime.timedelta(days=1),       # Day after Thanksgiving
+                datetime.date(year, 12, 24),                                    # Christmas Eve
+            }
+            early_closes = {date for date in early_closes if date.weekday() < 5 and date not in holidays}
+            self.years[year] = (holidays, early_closes)
+        return self.years[year]
+
+    def is_trading_day(self, date):
+        """
+        Check if the exchange has a session on the date
+        """
+        return date.weekday() < 5 and date not in self.__get_year(date.year)[0]
+
+    def get_session(self, date):
+        """
+        Get the open and close of the session on the date
+        :return: Tuple of the open and close (Eastern datetimes), None if there is no session
+        """
+        if not self.is_trading_day(date):
+            return None
+        close = EARLY_CLOSE if date in self.__get_year(date.year)[1] else SESSION_CLOSE
+        return (
+            MARKET_TIMEZONE.localize(datetime.datetime.combine(date, SESSION_OPEN)),
+            MARKET_TIMEZONE.localize(datetime.datetime.combine(date, close))
+        )
+
+    def is_open(self, now=None):
+        """
+        Check if the session is open at the given time (default: now)
+        """
+        now = now if now is not None else datetime.datetime.now(MARKET_TIMEZONE)
+        session = self.get_session(now.astimezone(MARKET_TIMEZONE).date())
+        return session is not None and session[0] <= now < session[1]
@@ -0,0 +1,222 @@
+import time
+import bisect
+import threading
+import contextlib
+from collections import deque
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stages of the signal pipeline, in order
+PIPELINE_STAGES = ("sync", "fetch", "indicators", "signal", "render", "publish", "cycle")
+
+# Metrics of this process
+pipeline_metrics = None
+
+def get_pipeline_metrics():
+    """
+    Get the pipeline metrics of this process, they are created on the first use
+    """
+    global pipeline_metrics
+    if pipeline_metrics is None:
+        pipeline_metrics = PipelineMetrics()
+    return pipeline_metrics
+
+
+class LatencyHistogram:
+    """
+    A class to represent the latencies of a stage
+    Cumulative buckets for the Prometheus histogram and the recent latencies for the percentiles
+    """
+    def __init__(self, recent=1024):
+        """
+        :param recent: Number of recent latencies kept for the percentiles
+        """
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def observe(self, seconds):
+        """
+        Add a latency
+        """
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def get_percentile(self, percentile):
+        """
+        Get a percentile (0 to 100) of the recent latencies, None if there is no latency
+        """
+        if len(self.recent) == 0:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+
+class PipelineMetrics:
+    """
+    A class to represent the metrics of the signal pipeline
+    Latency histograms and errors per stage, counters, gauges and the errors per symbol.
+    The metrics are updated from the event loop and from the download threads, all the updates hold a lock
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.histograms = {stage: LatencyHistogram() for stage in PIPELINE_STAGES}
+        self.stage_errors = {stage: 0 for stage in PIPELINE_STAGES}
+        self.counters = {}
+        self.gauges = {}
+        # symbol: {"runs", "errors", "last_error", "last_stage"}
+        self.symbols = {}
+
+    def observe(self, stage, seconds):
+        """
+        Add a latency of a stage
+        """
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+                self.stage_errors[stage] = 0
+            self.histograms[stage].observe(seconds)
+
+    def record_error(self, stage, symbol=None, error=None):
+        """
+        Count an error of a stage, for the symbol if given
+        """
+        with self.lock:
+            self.stage_errors[stage] = self.stage_errors.get(stage, 0) + 1
+            if symbol is not None:
+                entry = self.__get_symbol(symbol)
+                entry["errors"] += 1
+                entry["last_error"] = str(error)
+                entry["last_stage"] = stage
+
+    def record_run(self, symbol):
+        """
+        Count a scan of the symbol
+        """
+        with self.lock:
+            self.__get_symbol(symbol)["runs"] += 1
+
+    def __get_symbol(self, symbol):
+        """
+        Get the entry of the symbol, the lock must be held
+        """
+        if symbol not in self.symbols:
+            self.symbols[symbol] = {"runs": 0, "errors": 0, "last_error": None, "last_stage": None}
+        return self.symbols[symbol]
+
+    def increment(self, name, value=1):
+        """
+        Increase a counter
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """
+        Set a gauge to the current value
+        """
+        with self.lock:
+            self.gauges[name] = value
+
+    @contextlib.contextmanager
+    def time(self, stage, symbol=None):
+        """
+        Measure the latency of the block as a stage, an exception is counted as an error of the stage and raised again
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(stage, symbol, e)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage, func, symbol=None):
+        """
+        Wrap a function so that every call is measured as a stage, used for the functions run in other threads
+        """
+        def timed_func(*args, **kwargs):
+            with self.time(stage, symbol):
+                return func(*args, **kwargs)
+        return timed_func
+
+    def get_stage_totals(self):
+        """
+        Get the number of latencies and the total seconds of every stage
+        :return: Dictionary of stage: (count, seconds)
+        """
+        with self.lock:
+            return {stage: (histogram.count, histogram.sum) for stage, histogram in self.histograms.items()}
+
+    def get_summary(self, top_symbols=5):
+        """
+        Get a text summary of the metrics
+        """
+        with self.lock:
+            lines = [f"Uptime: {int(time.time() - self.started_at)} s"]
+            last_cycle = self.gauges.get("last_cycle_end", None)
+            if last_cycle is not None:
+                lines.append(f"Last cycle: {int(time.time() - last_cycle)} s ago")
+            lines.append(f"{'stage':<11}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'errors':>8}")
+            for stage, histogram in self.histograms.items():
+                if histogram.count == 0 and self.stage_errors.get(stage, 0) == 0:
+                    continue
+                p50 = histogram.get_percentile(50) or 0.0
+                p95 = histogram.get_percentile(95) or 0.0
+                lines.append(f"{stage:<11}{histogram.count:>7}{p50 * 1000:>9.0f}{p95 * 1000:>9.0f}{histogram.max * 1000:>9.0f}{self.stage_errors.get(stage, 0):>8}")
+            for name, value in sorted({**self.counters, **{name: value for name, value in self.gauges.items() if name != 'last_cycle_end'}}.items()):
+                lines.append(f"{name}: {value}")
+            failing = sorted(((entry["errors"], symbol) for symbol, entry in self.symbols.items() if entry["errors"] > 0), reverse=True)[:top_symbols]
+            if failing:
+                lines.append("Symbols with errors:")
+                for errors, symbol in failing:
+                    entry = self.symbols[symbol]
+                    lines.append(f"  {symbol}: {errors}/{entry['runs']} ({entry['last_stage']}: {entry['last_error']})")
+            return '\n'.join(lines)
+
+    def to_prometheus(self):
+        """
+        Get the metrics in the Prometheus text format
+        """
+        lines = []
+        with self.lock:
+            lines.append("# HELP signal_stage_seconds Latency of the signal pipeline stages")
+            lines.append("# TYPE signal_stage_seconds histogram")
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'signal_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'signal_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'signal_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'signal_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append("# HELP signal_stage_errors_total Errors of the signal pipeline stages")
+            lines.append("# TYPE signal_stage_errors_total counter")
+            for stage, errors in self.stage_errors.items():
+                lines.append(f'signal_stage_errors_total{{stage="{stage}"}} {errors}')
+
+            lines.append("# HELP signal_symbol_runs_total Scans per symbol")
+            lines.append("# TYPE signal_symbol_runs_total counter")
+            for symbol, entry in self.symbols.items():
+                lines.append(f'signal_symbol_runs_total{{symbol="{symbol}"}} {entry["runs"]}')
+            lines.append("# HELP signal_symbol_errors_total Errors per symbol")
+            lines.append("# TYPE signal_symbol_errors_total counter")
+            for symbol, entry in self.symbols.items():
+                lines.append(f'signal_symbol_errors_total{{symbol="{symbol}"}} {entry["errors"]}')
+
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE signal_{name}_total counter")
+                lines.append(f"signal_{name}_total {value}")
+            for name, value in self.gauges.items():
+                lines.append(f"# TYPE signal_{name} gauge")
+                lines.append(f"signal_{name} {value}")
+        return '\n'.join(lines) + '\n'
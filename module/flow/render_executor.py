@@ -0,0 +1,52 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+class RenderExecutor:
+    """
+    A class to represent a pool of processes rendering the signal plots
+    Rendering runs outside of the event loop, so that the bot keeps responding while the plots are rendered,
+    and several plots are rendered in parallel across the cores
+    """
+    def __init__(self, max_workers=None):
+        """
+        :param max_workers: Number of rendering processes (default: number of cores)
+        """
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.executor = None
+
+    def __get_executor(self):
+        """
+        Get the process pool, it is started on the first render
+        The processes are spawned, not forked: the download and AI threads are already running
+        and a forked process could inherit a lock held by one of them and never return
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    async def render(self, render_func, plot_data):
+        """
+        Render a plot in the process pool
+        :param render_func: Static render function of the signal
+        :param plot_data: Data to render
+        :return: PNG image bytes
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.__get_executor(), render_func, plot_data)
+        except BrokenProcessPool:
+            # A rendering process died, start a new pool and try once more
+            print("Rendering process pool is broken, restarting it")
+            self.shutdown()
+            return await loop.run_in_executor(self.__get_executor(), render_func, plot_data)
+
+    def shutdown(self):
+        """
+        Stop the rendering processes
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,109 @@
+import os
+import io
+import time
+import pstats
+import cProfile
+import datetime
+import tracemalloc
+
+class ScanProfiler:
+    """
+    A class to represent the on demand profiling of the scan cycles
+    The next requested cycles run under cProfile and tracemalloc, every cycle writes a pstats file (.prof)
+    and a text report with the symbol count, the stage timings, the top functions and the top allocations.
+    cProfile sees the event loop thread only, the time spent in the fetch and render threads shows as waiting;
+    tracemalloc sees the allocations of all the threads.
+    While no cycle is requested the scan does not go through the profiler
+    """
+    def __init__(self, cycles=0, folder='.data/profiles', top_functions=40, top_allocations=25):
+        """
+        :param cycles: Number of the next cycles to profile
+        :param folder: Folder of the reports
+        :param top_functions: Number of functions in the report
+        :param top_allocations: Number of allocation sites in the report
+        """
+        self.remaining = cycles
+        self.folder = folder
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+
+    def request(self, cycles):
+        """
+        Profile the next cycles, 0 cancels the pending cycles
+        """
+        self.remaining = max(0, cycles)
+
+    async def profile(self, cycle, label, metrics=None):
+        """
+        Run a scan cycle under the profiler and write its reports
+        :param cycle: Coroutine of the cycle, it returns the number of scanned symbols
+        :param label: Label of the cycle in the file names
+        :param metrics: Pipeline metrics, the time spent per stage during the cycle is added to the report
+        :return: Result of the cycle
+        """
+        self.remaining = max(0, self.remaining - 1)
+        stages_before = metrics.get_stage_totals() if metrics is not None else {}
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = await cycle
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            snapshot_after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+        stages_after = metrics.get_stage_totals() if metrics is not None else {}
+        stages = {
+            stage: (count - stages_before.get(stage, (0, 0.0))[0], total - stages_before.get(stage, (0, 0.0))[1])
+            for stage, (count, total) in stages_after.items()
+            if count > stages_before.get(stage, (0, 0.0))[0]
+        }
+        try:
+            path = self.__write_reports(label, result, seconds, stages, profiler, snapshot_after.compare_to(snapshot_before, 'lineno'), peak)
+            print(f"Scan profile written to {path}")
+        except Exception as e:
+            print(f"Failed to write the scan profile: {e}")
+        return result
+
+    def __write_reports(self, label, symbol_count, seconds, stages, profiler, allocations, peak):
+        """
+        Write the pstats file and the text report of a cycle
+        :return: Path of the text report
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        name = f"scan_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{label}"
+        profiler.dump_stats(os.path.join(self.folder, f"{name}.prof"))
+
+        report = io.StringIO()
+        report.write(f"Scan cycle {label}\n")
+        report.write(f"Symbols: {symbol_count}\n")
+        report.write(f"Cycle: {seconds:.3f} s\n")
+        report.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+
+        if stages:
+            report.write(f"{'stage':<11}{'count':>7}{'sum s':>10}\n")
+            for stage, (count, total) in stages.items():
+                report.write(f"{stage:<11}{count:>7}{total:>10.3f}\n")
+            report.write("\n")
+
+        report.write(f"Top {self.top_functions} functions by cumulative time (event loop thread)\n")
+        pstats.Stats(profiler, stream=report).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_functions)
+
+        report.write(f"Top {self.top_allocations} allocation sites by size during the cycle\n")
+        for stat in allocations[:self.top_allocations]:
+            report.write(f"{stat}\n")
+
+        path = os.path.join(self.folder, f"{name}.txt")
+        with open(path, 'w') as report_file:
+            report_file.write(report.getvalue())
+        return path
@@ -0,0 +1,176 @@
+import os
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from module.trade.ticker import SimTicker
+from module.trade.bar_store import BarStore
+from module.trade.indicator.ema_kernel import ema_matrix
+from module.flow.backtest import get_statistics
+
+#-----------------------------------------------------------
+# Grid parameter sweep of the Saty Pivot Ribbon over the stored bars of many symbols
+# Run from the repository root: python -m module.flow.sweep SPY AAPL --fast 5,8 --pivot 21 --slow 34 --fast-conviction 8,13 --slow-conviction 34,48
+#-----------------------------------------------------------
+
+def get_grid(fast=(8,), pivot=(21,), slow=(34,), fast_conviction=(13,), slow_conviction=(48,), confirm=False):
+    """
+    Get the parameter combinations to evaluate, the EMAs of a combination must be ordered (fast < pivot < slow)
+    The live signal is the conviction change (fast conviction & slow conviction EMA), the cloud EMAs (fast, pivot, slow)
+    only take part when the signals are confirmed by the cloud, otherwise only the conviction pairs are evaluated
+    :param confirm: Keep only the signals in the direction of the pivot cloud
+    :return: List of the combinations (dictionary of the spans)
+    """
+    if not confirm:
+        fast, pivot, slow = fast[:1], pivot[:1], slow[:1]
+    return [
+        {"fast": f, "pivot": p, "slow": s, "fast_conviction": fc, "slow_conviction": sc, "confirm": confirm}
+        for f, p, s, fc, sc in itertools.product(fast, pivot, slow, fast_conviction, slow_conviction)
+        if f < p < s and fc < sc
+    ]
+
+
+def get_conviction_transitions(fast_conviction_ema, slow_conviction_ema):
+    """
+    Find the conviction changes, bars with equal EMAs keep the previous conviction and the initial conviction is not a change
+    :return: Tuple of the positions of the changes and the direction of the new conviction (1 bullish, -1 bearish)
+    """
+    state = np.sign(fast_conviction_ema - slow_conviction_ema)
+    # Forward fill the bars without a conviction
+    filled = np.maximum.accumulate(np.where(state != 0, np.arange(len(state)), 0))
+    state = state[filled]
+    changed = np.flatnonzero((state[1:] != state[:-1]) & (state[1:] != 0)) + 1
+    # The first change from no conviction sets the initial conviction
+    if len(changed) > 0 and state[changed[0] - 1] == 0:
+        changed = changed[1:]
+    return changed, state[changed]
+
+
+def sweep_symbol(symbol, grid, start_date, end_date, interval, timezone, bar_store_folder):
+    """
+    Evaluate all the combinations of the grid over the stored bars of a symbol, runs in a sweep process
+    The EMAs of all the spans of the grid are computed together in one pass
+    :return: Dictionary with the symbol and the statistics of every combination, or the error
+    """
+    try:
+        ticker = SimTicker(symbol, BarStore(bar_store_folder))
+        ticker.load_historical_data(start_date, end_date, interval, timezone)
+        if ticker.historical_data is None or len(ticker.historical_data) == 0:
+            return {"symbol": symbol, "error": "No stored bars"}
+
+        closes = ticker.historical_data['Close'].to_numpy(dtype=np.float64)
+        spans = sorted({combination[name] for combination in grid for name in ("fast", "pivot", "slow", "fast_conviction", "slow_conviction")})
+        emas = dict(zip(spans, ema_matrix(closes, spans)))
+
+        conviction_transitions = {}
+        clouds = {}
+        results = []
+        for combination in grid:
+            conviction = (combination["fast_conviction"], combination["slow_conviction"])
+            if conviction not in conviction_transitions:
+                conviction_transitions[conviction] = get_conviction_transitions(emas[conviction[0]], emas[conviction[1]])
+            positions, directions = conviction_transitions[conviction]
+
+            # Every signal opens a position closed by the next signal, the last one at the last close
+            entry_price = closes[positions]
+            exit_price = np.append(entry_price[1:], closes[-1])
+            returns = directions * (exit_price / entry_price - 1.0)
+
+            if combination["confirm"]:
+                cloud = (combination["fast"], combination["pivot"], combination["slow"])
+                if cloud not in clouds:
+                    fast_ema, pivot_ema, slow_ema = emas[cloud[0]], emas[cloud[1]], emas[cloud[2]]
+                    clouds[cloud] = np.where((fast_ema >= pivot_ema) & (pivot_ema >= slow_ema), 1, np.where((fast_ema < pivot_ema) & (pivot_ema <= slow_ema), -1, 0))
+                returns = returns[clouds[cloud][positions] == directions]
+
+            results.append({**combination, **get_statistics(returns)})
+        return {"symbol": symbol, "results": results}
+    except Exception as e:
+        return {"symbol": symbol, "error": str(e)}
+
+
+class Sweep:
+    """
+    A class to represent a grid parameter sweep of the Saty Pivot Ribbon over the stored bars of many symbols
+    The symbols are spread over a pool of processes, every process evaluates the whole grid for its symbol
+    """
+    def __init__(self, max_workers=None, bar_store_folder='.data/bars'):
+        """
+        :param max_workers: Number of sweep processes (default: number of cores)
+        :param bar_store_folder: Folder of the bar store with the history of the symbols
+        """
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.bar_store_folder = bar_store_folder
+
+    def run(self, symbols, grid, start_date=None, end_date=None, interval='5m', timezone='America/New_York', rank_by='average_return'):
+        """
+        Evaluate the grid for the symbols and rank the combinations
+        :param symbols: Symbols with bars in the bar store
+        :param grid: Combinations returned by get_grid
+        :param rank_by: Statistic of the ranking (average_return, total_return, hit_rate or compounded_return)
+        :return: Dictionary with the ranking (DataFrame, one row per combination), the results per symbol and the errors
+        """
+        arguments = (grid, start_date, end_date, interval, timezone, self.bar_store_folder)
+        if self.max_workers == 1:
+            results = [sweep_symbol(symbol, *arguments) for symbol in symbols]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(sweep_symbol, symbol, *arguments) for symbol in symbols]
+                results = [future.result() for future in futures]
+
+        errors = {result["symbol"]: result["error"] for result in results if "error" in result}
+        per_symbol = pd.DataFrame([
+            {"symbol": result["symbol"], **combination}
+            for result in results if "error" not in result
+            for combination in result["results"]
+        ])
+        if per_symbol.empty:
+            return {"ranking": per_symbol, "per_symbol": per_symbol, "errors": errors}
+
+        # Combine the symbols, the hit rate is weighted by the number of trades
+        parameters = ["fast", "pivot", "slow", "fast_conviction", "slow_conviction", "confirm"]
+        per_symbol["hits"] = per_symbol["hit_rate"].fillna(0) * per_symbol["trades"]
+        ranking = per_symbol.groupby(parameters).agg(
+            symbols=("symbol", "count"),
+            trades=("trades", "sum"),
+            hits=("hits", "sum"),
+            average_return=("average_return", "mean"),
+            total_return=("total_return", "mean"),
+            compounded_return=("compounded_return", "mean"),
+        ).reset_index()
+        ranking["hit_rate"] = ranking["hits"] / ranking["trades"].where(ranking["trades"] > 0)
+        ranking = ranking.drop(columns=["hits"]).sort_values(rank_by, ascending=False, ignore_index=True)
+        return {"ranking": ranking, "per_symbol": per_symbol.drop(columns=["hits"]), "errors": errors}
+
+
+if __name__ == "__main__":
+    def spans(text):
+        return tuple(int(span) for span in text.split(','))
+
+    parser = argparse.ArgumentParser(description="Grid parameter sweep of the Saty Pivot Ribbon over the stored bars")
+    parser.add_argument("symbols", nargs="+", help="Symbols with bars in the bar store")
+    parser.add_argument("--fast", type=spans, default=(8,), help="Fast EMA spans (comma separated)")
+    parser.add_argument("--pivot", type=spans, default=(21,), help="Pivot EMA spans (comma separated)")
+    parser.add_argument("--slow", type=spans, default=(34,), help="Slow EMA spans (comma separated)")
+    parser.add_argument("--fast-conviction", type=spans, default=(13,), help="Fast conviction EMA spans (comma separated)")
+    parser.add_argument("--slow-conviction", type=spans, default=(48,), help="Slow conviction EMA spans (comma separated)")
+    parser.add_argument("--confirm", action="store_true", help="Keep only the signals in the direction of the pivot cloud")
+    parser.add_argument("--start", default=None, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--interval", default="5m", help="Interval of the bars")
+    parser.add_argument("--workers", type=int, default=None, help="Number of sweep processes")
+    parser.add_argument("--rank-by", default="average_return", help="Statistic of the ranking")
+    parser.add_argument("--top", type=int, default=20, help="Number of combinations printed")
+    parser.add_argument("--output", default=None, help="CSV file for the full ranking")
+    args = parser.parse_args()
+
+    grid = get_grid(args.fast, args.pivot, args.slow, args.fast_conviction, args.slow_conviction, args.confirm)
+    print(f"Evaluating {len(grid)} combinations for {len(args.symbols)} symbols")
+    result = Sweep(max_workers=args.workers).run(args.symbols, grid, args.start, args.end, args.interval, rank_by=args.rank_by)
+    print(result["ranking"].head(args.top).to_string(index=False))
+    for symbol, error in result["errors"].items():
+        print(f"Error for {symbol}: {error}")
+    if args.output is not None:
+        result["ranking"].to_csv(args.output, index=False)
@@ -0,0 +1,150 @@
+import re
+import time
+import datetime
+import threading
+from collections import OrderedDict
+
+# Length in seconds of the bars of the yfinance intervals
+INTERVAL_SECONDS = {
+    '1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400, '1h': 3600,
+    '1d': 86400, '5d': 432000, '1wk': 604800, '1mo': 2592000, '3mo': 7776000,
+}
+
+# Longest time data still receiving bars is reused, the last daily (or longer) bar changes during the session
+MAX_LIVE_TTL_SECONDS = 900
+
+# Time data of a range that has ended is reused, its bars do not change anymore
+HISTORICAL_TTL_SECONDS = 86400
+
+def normalize_question(question):
+    """
+    Normalize a question so that the same question asked twice gets the same key
+    The mentions are removed, the case and the spaces are ignored
+    """
+    question = re.sub(r'<@[!&]?\d+>', ' ', question)
+    return ' '.join(question.lower().split())
+
+
+def get_data_ttl(end_date, interval, now=None):
+    """
+    Get the time the data of a range is reused
+    Data receiving new bars is reused for one bar (at most MAX_LIVE_TTL_SECONDS), data of a range that has ended for HISTORICAL_TTL_SECONDS
+    :param end_date: End date of the range (YYYY-MM-DD, excluded)
+    :param interval: Interval of the bars
+    """
+    now = now if now is not None else datetime.datetime.now()
+    # One day of margin for the difference between the local and the market time zones
+    if datetime.datetime.strptime(end_date, '%Y-%m-%d') <= now - datetime.timedelta(days=1):
+        return HISTORICAL_TTL_SECONDS
+    return min(INTERVAL_SECONDS.get(interval, MAX_LIVE_TTL_SECONDS), MAX_LIVE_TTL_SECONDS)
+
+
+class TTLCache:
+    """
+    A class to represent a bounded LRU cache where every entry expires after its own time to live
+    Used from the AI threads, all the accesses hold a lock
+    """
+    def __init__(self, max_entries=256):
+        """
+        :param max_entries: Maximum number of entries kept, the least recently used entry is dropped first
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get a value, None if not cached or expired
+        """
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl_seconds):
+        """
+        Add a value for the given time to live
+        """
+        with self.lock:
+            self.entries[key] = (value, time.time() + ttl_seconds)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class AICache:
+    """
+    A class to represent the caches of the TickerAI
+    - arguments: normalized question (and current date) to the validated API arguments, skips the arguments LLM call
+    - data: API arguments (symbol, start, end, interval) to the fetched data, skips the download
+    - answers: normalized question and data version to the final answer, skips the query and synthesis LLM calls
+    The entries live as long as the data they come from (see get_data_ttl)
+    """
+    def __init__(self, max_questions=256, max_data=32):
+        """
+        :param max_questions: Maximum number of arguments and of answers kept
+        :param max_data: Maximum number of fetched data kept
+        """
+        self.arguments = TTLCache(max_questions)
+        self.data = TTLCache(max_data)
+        self.answers = TTLCache(max_questions)
+
+    def get_arguments_key(self, question):
+        # The arguments of relative questions ("today", "last week") depend on the current date
+        return (datetime.date.today().isoformat(), normalize_question(question))
+
+    def get_data_key(self, arguments):
+        return (arguments['symbol'].upper(), arguments['start_date'], arguments['end_date'], arguments['interval'])
+
+    def get_ttl(self, arguments):
+        return get_data_ttl(arguments['end_date'], arguments['interval'])
+
+    def get_arguments(self, question):
+        """
+        Get the cached API arguments of a question, None if not cached
+        """
+        return self.arguments.get(self.get_arguments_key(question))
+
+    def put_arguments(self, question, arguments):
+        """
+        Cache the validated API arguments of a question
+        """
+        self.arguments.put(self.get_arguments_key(question), arguments, self.get_ttl(arguments))
+
+    def get_data(self, arguments):
+        """
+        Get the cached data of the API arguments
+        :return: Dictionary with the data and its version, None if not cached
+        """
+        return self.data.get(self.get_data_key(arguments))
+
+    def put_data(self, arguments, dataframe):
+        """
+        Cache the data fetched for the API arguments
+        The version changes with the last bar and the number of bars, so the answers follow the new bars
+        The data is never changed, the queries run on a copy of it
+        :return: Dictionary with the data and its version
+        """
+        # The historical data of a Ticker has a column index, the time of the bars is the Datetime column
+        version = f"{len(dataframe)}:{dataframe['Datetime'].iloc[-1] if len(dataframe) > 0 else None}"
+        entry = {"data": dataframe, "version": version}
+        self.data.put(self.get_data_key(arguments), entry, self.get_ttl(arguments))
+        return entry
+
+    def get_answer(self, question, version):
+        """
+        Get the cached answer of a question on a data version, None if not cached
+        """
+        return self.answers.get((normalize_question(question), version))
+
+    def put_answer(self, question, version, answer, arguments):
+        """
+        Cache the answer of a question on a data version
+        """
+        self.answers.put((normalize_question(question), version), answer, self.get_ttl(arguments))
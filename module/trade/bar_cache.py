@@ -0,0 +1,83 @@
+import pandas as pd
+
+from module.trade.bar_store import BarStore
+
+# -----------------------------------------------------------
+# Local OHLCV bar cache per (symbol, interval)
+# -----------------------------------------------------------
+class BarCache:
+    """
+    A class to represent a persistent cache of the downloaded bars
+    Bars are kept in the columnar bar store per (symbol, interval), together with the start of the range they cover,
+    so that only the bars after the last stored timestamp have to be downloaded again
+    """
+    def __init__(self, bar_store=None):
+        self.bar_store = bar_store if bar_store is not None else BarStore()
+
+    def __get_covered_start(self, symbol, interval):
+        """
+        Get the start of the continuous range covered by the stored bars
+        :return: Start (tz-aware timestamp), None if nothing is stored
+        """
+        start = self.bar_store.read_meta(symbol, interval).get("start", None)
+        if start is None or self.bar_store.get_length(symbol, interval) == 0:
+            return None
+        return pd.Timestamp(start)
+
+    def get_last_timestamp(self, symbol, interval):
+        """
+        Get the timestamp of the last stored bar
+        :return: Timestamp (UTC) of the last bar, None if nothing is cached
+        """
+        return self.bar_store.get_last_timestamp(symbol, interval)
+
+    def get_fetch_start(self, symbol, interval, start):
+        """
+        Get the start from which the bars have to be downloaded to complete the cache
+        The last stored bar is downloaded again as it may still be forming
+        :param start: Start (tz-aware timestamp) of the required range
+        :return: Start (tz-aware timestamp) for the download
+        """
+        with self.bar_store.lock(symbol, interval):
+            covered_start = self.__get_covered_start(symbol, interval)
+            if covered_start is None or covered_start > start:
+                return start
+            last_timestamp = self.bar_store.get_last_timestamp(symbol, interval)
+        if last_timestamp < start:
+            # The stored bars end before the range (e.g. after a long time offline), download the range instead of the gap
+            return start
+        return last_timestamp
+
+    def merge(self, symbol, interval, new_data, start, end=None, timezone='America/New_York'):
+        """
+        Merge the downloaded bars into the cache, downloaded bars replace the stored bars from their first timestamp
+        :param new_data: Downloaded bars
+        :param start: Start (tz-aware timestamp) of the range the download completes
+        :param end: End (tz-aware timestamp) of the range to return, None for after the last bar
+        :param timezone: Timezone of the tz-naive (daily) bars
+        :return: Cached bars for the symbol and interval in [start, end)
+        """
+        new_data = new_data.dropna(how='all')
+        if new_data.index.tzinfo is None:
+            new_data.index = new_data.index.tz_localize(timezone)
+
+        # The scan and the AI threads can merge the same symbol, the merge is done under the lock of the stored bars
+        with self.bar_store.lock(symbol, interval):
+            covered_start = self.__get_covered_start(symbol, interval)
+            last_timestamp = self.bar_store.get_last_timestamp(symbol, interval)
+            self.bar_store.write(symbol, interval, new_data)
+            if covered_start is None:
+                covered_start = start
+            elif covered_start <= start <= last_timestamp:
+                # The download continued from the last stored bar (see get_fetch_start), the covered range is unchanged
+                pass
+            elif not new_data.empty and new_data.index[0] > last_timestamp:
+                # There is a gap after the stored bars, the continuous range starts with the downloaded range
+                covered_start = start
+            elif not new_data.empty and new_data.index[-1] >= covered_start:
+                # The downloaded range reaches the covered range, the covered range starts with the downloaded range
+                covered_start = min(covered_start, start)
+            # Otherwise the downloaded bars end before the covered range, which is unchanged
+            self.bar_store.write_meta(symbol, interval, {"start": covered_start.isoformat()})
+
+            return self.bar_store.read(symbol, interval, start, end)
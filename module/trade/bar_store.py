@@ -0,0 +1,194 @@
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+# Locks of the stored (folder, symbol, interval) of this process, shared by all the bar stores of the same folder
+bar_locks = {}
+bar_locks_lock = threading.Lock()
+
+# -----------------------------------------------------------
+# Columnar bar store per (symbol, interval)
+# -----------------------------------------------------------
+class BarStore:
+    """
+    A class to represent an on-disk columnar store of OHLCV bars
+    Every field of a (symbol, interval) is an append-only binary file with a fixed dtype,
+    the files are memory-mapped so that a time range can be sliced without loading the whole history
+    Layout: {folder}/{symbol}/{interval}/{field}.bin and meta.json
+    The reads and writes of a (symbol, interval) hold its lock, the scan and the AI threads use the same files
+    """
+    COLUMNS = {
+        "Datetime": np.int64,  # UTC nanoseconds
+        "Open": np.float64,
+        "High": np.float64,
+        "Low": np.float64,
+        "Close": np.float64,
+        "Adj Close": np.float64,
+        "Volume": np.float64,
+    }
+
+    def __init__(self, folder='.data/bars'):
+        self.folder = folder
+
+    def __path(self, symbol, interval, name=None):
+        """
+        Get the folder for the symbol and interval or the file of the given name in that folder
+        """
+        path = os.path.join(self.folder, symbol, interval)
+        if name is None:
+            return path
+        return os.path.join(path, name)
+
+    def lock(self, symbol, interval):
+        """
+        Get the lock of the symbol and interval, held to read or write the bars (reentrant)
+        """
+        key = (os.path.abspath(self.folder), symbol, interval)
+        with bar_locks_lock:
+            if key not in bar_locks:
+                bar_locks[key] = threading.RLock()
+            return bar_locks[key]
+
+    def __column(self, symbol, interval, column, length):
+        """
+        Memory-map a column file
+        :return: Read-only array of the first length values of the column
+        """
+        if length == 0:
+            return np.empty(0, dtype=self.COLUMNS[column])
+        return np.memmap(self.__path(symbol, interval, f'{column}.bin'), dtype=self.COLUMNS[column], mode='r', shape=(length,))
+
+    def has_symbol(self, symbol):
+        """
+        Check if any bars are stored for the symbol
+        """
+        return os.path.isdir(os.path.join(self.folder, symbol))
+
+    def get_length(self, symbol, interval):
+        """
+        Get the number of bars stored for the symbol and interval
+        A partially written bar (e.g. after a crash) is ignored as the length is the shortest column
+        """
+        length = None
+        for column, dtype in self.COLUMNS.items():
+            try:
+                column_length = os.path.getsize(self.__path(symbol, interval, f'{column}.bin')) // np.dtype(dtype).itemsize
+            except FileNotFoundError:
+                return 0
+            length = column_length if length is None else min(length, column_length)
+        return length
+
+    def get_timestamps(self, symbol, interval):
+        """
+        Get the memory-mapped timestamps (UTC nanoseconds) of the stored bars
+        """
+        return self.__column(symbol, interval, "Datetime", self.get_length(symbol, interval))
+
+    def get_last_timestamp(self, symbol, interval):
+        """
+        Get the timestamp of the last stored bar
+        :return: Timestamp (UTC) of the last bar, None if nothing is stored
+        """
+        with self.lock(symbol, interval):
+            timestamps = self.get_timestamps(symbol, interval)
+            if len(timestamps) == 0:
+                return None
+            return pd.Timestamp(int(timestamps[-1]), tz='UTC')
+
+    def get_range_index(self, symbol, interval, start=None, end=None):
+        """
+        Get the position of the bars in [start, end)
+        :param start: Start (tz-aware timestamp), None for the first bar
+        :param end: End (tz-aware timestamp), None for after the last bar
+        :return: Tuple of start and end position
+        """
+        with self.lock(symbol, interval):
+            timestamps = self.get_timestamps(symbol, interval)
+            i = 0 if start is None else int(np.searchsorted(timestamps, pd.Timestamp(start).value, side='left'))
+            j = len(timestamps) if end is None else int(np.searchsorted(timestamps, pd.Timestamp(end).value, side='left'))
+            return i, max(i, j)
+
+    def read_slice(self, symbol, interval, i, j):
+        """
+        Read the bars between the given positions into a DataFrame, only the sliced part is loaded into memory
+        :return: DataFrame with a UTC Datetime index
+        """
+        data = {}
+        with self.lock(symbol, interval):
+            length = self.get_length(symbol, interval)
+            for column in self.COLUMNS:
+                data[column] = np.array(self.__column(symbol, interval, column, length)[i:j])
+        index = pd.DatetimeIndex(pd.to_datetime(data.pop("Datetime"), utc=True), name="Datetime")
+        return pd.DataFrame(data, index=index)
+
+    def read(self, symbol, interval, start=None, end=None):
+        """
+        Read the bars in [start, end)
+        :param start: Start (tz-aware timestamp), None for the first bar
+        :param end: End (tz-aware timestamp), None for after the last bar
+        :return: DataFrame with a UTC Datetime index
+        """
+        with self.lock(symbol, interval):
+            i, j = self.get_range_index(symbol, interval, start, end)
+            return self.read_slice(symbol, interval, i, j)
+
+    def __write_columns(self, symbol, interval, data, position):
+        """
+        Truncate every column file at the given position and append the bars
+        """
+        os.makedirs(self.__path(symbol, interval), exist_ok=True)
+        values = {"Datetime": data.index.tz_convert('UTC').values.astype('datetime64[ns]').astype(np.int64)}
+        for column in self.COLUMNS:
+            if column != "Datetime":
+                values[column] = data[column].to_numpy(dtype=self.COLUMNS[column]) if column in data else np.full(len(data), np.nan)
+
+        # The timestamps are written last so that the length never includes a partially written bar
+        for column in list(self.COLUMNS)[1:] + ["Datetime"]:
+            with open(self.__path(symbol, interval, f'{column}.bin'), 'ab') as column_file:
+                column_file.truncate(position * np.dtype(self.COLUMNS[column]).itemsize)
+                column_file.write(np.ascontiguousarray(values[column], dtype=self.COLUMNS[column]).tobytes())
+
+    def write(self, symbol, interval, data):
+        """
+        Write the bars into the store, the given bars replace the stored bars of their range,
+        the stored bars before and after the range are kept
+        :param data: DataFrame with a tz-aware index and OHLCV columns
+        """
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        if data.empty:
+            return
+
+        with self.lock(symbol, interval):
+            timestamps = self.get_timestamps(symbol, interval)
+            position = int(np.searchsorted(timestamps, data.index[0].value, side='left'))
+            after = int(np.searchsorted(timestamps, data.index[-1].value, side='right'))
+            if after < len(timestamps):
+                # The bars end before the last stored bar, the stored bars after them are written again behind them
+                # The stored bars are read in UTC, both frames must be in the same timezone to keep a DatetimeIndex
+                data = pd.concat([data.tz_convert('UTC'), self.read_slice(symbol, interval, after, len(timestamps))])
+            del timestamps
+
+            self.__write_columns(symbol, interval, data, position)
+
+    def read_meta(self, symbol, interval):
+        """
+        Read the metadata of the symbol and interval
+        """
+        try:
+            with self.lock(symbol, interval), open(self.__path(symbol, interval, 'meta.json'), 'r') as meta_file:
+                return json.loads(meta_file.read())
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return {}
+
+    def write_meta(self, symbol, interval, meta):
+        """
+        Write the metadata of the symbol and interval
+        """
+        os.makedirs(self.__path(symbol, interval), exist_ok=True)
+        path = self.__path(symbol, interval, 'meta.json')
+        with self.lock(symbol, interval):
+            with open(f'{path}.tmp', 'w') as meta_file:
+                meta_file.write(json.dumps(meta))
+            os.replace(f'{path}.tmp', path)
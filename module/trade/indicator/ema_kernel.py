@@ -0,0 +1,50 @@
+import numpy as np
+
+# Number of bars computed together in a block of the recursion
+EMA_BLOCK_BARS = 64
+
+def ema_matrix(prices, spans, block_bars=EMA_BLOCK_BARS):
+    """
+    Calculate the Exponential Moving Averages (adjust=False) of the prices for many spans in one recursive pass
+    The result matches pandas ewm(span=span, adjust=False).mean() for every span.
+    The bars are processed in blocks: inside a block the EMAs of all the spans are a matrix product with the decay powers,
+    only the last value of every block is carried to the next one, so the Python level recursion runs once per block
+    :param prices: Array of the prices
+    :param spans: List of the EMA spans
+    :param block_bars: Number of bars in a block
+    :return: 2-D array of the EMAs, one row per span and one column per bar
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    alphas = 2.0 / (np.asarray(spans, dtype=np.float64) + 1.0)
+    decays = 1.0 - alphas
+    count = len(prices)
+    if count == 0:
+        return np.empty((len(alphas), 0))
+
+    # Pad the prices to full blocks, the padded values are dropped at the end
+    blocks = -(-count // block_bars)
+    padded = np.zeros(blocks * block_bars)
+    padded[:count] = prices
+    padded = padded.reshape(blocks, block_bars)
+
+    # decay_powers[s, j] = decay ** j, weights[s, k, j] = alpha * decay ** (j - k) for k <= j
+    offsets = np.arange(block_bars)
+    decay_powers = decays[:, None] ** offsets
+    lags = offsets[None, :] - offsets[:, None]
+    weights = np.where(lags >= 0, alphas[:, None, None] * decay_powers[:, np.clip(lags, 0, None)], 0.0)
+
+    # EMAs of every block started from 0, spans by blocks by bars
+    values = np.matmul(padded[None, :, :], weights)
+
+    # Carry the last EMA of every block into the next one, the EMA before the first bar is the first price
+    carry = np.empty((len(alphas), blocks))
+    block_decays = decay_powers[:, -1] * decays
+    last = np.full(len(alphas), prices[0])
+    for block in range(blocks):
+        carry[:, block] = last
+        last = values[:, block, -1] + block_decays * last
+    values += carry[:, :, None] * (decay_powers * decays[:, None])[:, None, :]
+    values = values.reshape(len(alphas), -1)[:, :count]
+    # The first EMA is the first price, exactly as in pandas, so that the EMAs of all the spans start equal
+    values[:, 0] = prices[0]
+    return values
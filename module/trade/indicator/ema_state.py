@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+class EMAStateEngine:
+    """
+    Incremental Exponential Moving Averages (adjust=False) of the close price for a set of spans
+    The state holds the EMA values up to the last closed bar, so every update only applies the bars after it.
+    The last bar may still be forming, it is applied on top of the state without being stored.
+    The state is a JSON serializable dictionary so that it can be persisted with the signal cache.
+    """
+    def __init__(self, spans):
+        """
+        :param spans: Dictionary of EMA name and span
+        """
+        self.spans = dict(spans)
+        self.names = list(self.spans)
+        self.alphas = np.array([2.0 / (self.spans[name] + 1.0) for name in self.names])
+
+    def __seed(self, closes):
+        """
+        Calculate the EMA values over the given closes
+        """
+        return np.array([closes.ewm(span=self.spans[name], adjust=False).mean().iloc[-1] for name in self.names])
+
+    def update(self, state, df, price_column='Close', time_column='Datetime'):
+        """
+        Update the EMA state with the bars of the historical data which are not yet part of the state
+        :param state: EMA state from a previous update (empty dictionary for no state)
+        :param df: Historical data of the ticker
+        :return: Tuple of the new state and the dictionary of the EMA values at the last bar
+        """
+        last = len(df) - 1
+        timestamps = df[time_column].array
+
+        position = None
+        if state.get("spans", None) == self.spans and state.get("timestamp", None) is not None:
+            state_timestamp = pd.Timestamp(state["timestamp"], tz='UTC')
+            position = int(timestamps.searchsorted(state_timestamp))
+            if position >= len(timestamps) or timestamps[position] != state_timestamp or position >= last:
+                # The state is not part of the historical data (or ahead of it), start over
+                position = None
+
+        closes = df[price_column]
+        if position is None:
+            # Cold start, seed the EMAs from all the closed bars
+            if last == 0:
+                values = None
+            else:
+                values = self.__seed(closes.iloc[:last].astype('float64'))
+                position = last - 1
+        else:
+            values = np.array([state["values"][name] for name in self.names])
+            # Apply the bars closed since the last update
+            for price in closes.iloc[position + 1:last].astype('float64'):
+                values = self.alphas * price + (1 - self.alphas) * values
+            position = last - 1
+
+        price = float(closes.iloc[last])
+        if values is None:
+            new_state = {}
+            current = np.full(len(self.names), price)
+        else:
+            new_state = {
+                "spans": self.spans,
+                "timestamp": timestamps[position].value,
+                "values": {name: float(value) for name, value in zip(self.names, values)},
+            }
+            current = self.alphas * price + (1 - self.alphas) * values
+
+        return new_state, {name: float(value) for name, value in zip(self.names, current)}
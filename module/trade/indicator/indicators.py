@@ -0,0 +1,84 @@
+import numpy as np
+
+# -----------------------------------------------------------
+# Indicators that signals can declare and share
+# -----------------------------------------------------------
+class Indicator:
+    """
+    A class to represent an indicator computed over the historical data of a ticker
+    Indicators are identified by their key, so that two signals declaring the same indicator share one computation
+    """
+    def __init__(self, *key):
+        self.key = (type(self).__name__,) + key
+
+    def __eq__(self, other):
+        return isinstance(other, Indicator) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"{self.key[0]}{self.key[1:]}"
+
+    def calculate(self, df, cache):
+        """
+        Calculate the indicator
+        :param df: Historical data of the ticker
+        :param cache: Indicator cache of the ticker, to get the indicators this indicator depends on
+        :return: Array with one value per bar
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+
+class EMA(Indicator):
+    """
+    Exponential Moving Average (adjust=False) of a column
+    """
+    def __init__(self, period, source='Close'):
+        super().__init__(period, source)
+        self.period = period
+        self.source = source
+
+    def calculate(self, df, cache):
+        return df[self.source].astype('float64').ewm(span=self.period, adjust=False).mean().to_numpy()
+
+
+class Above(Indicator):
+    """
+    True for the bars where the first indicator is above the second indicator
+    """
+    def __init__(self, first, second):
+        super().__init__(first, second)
+        self.first = first
+        self.second = second
+
+    def calculate(self, df, cache):
+        return cache.get(self.first) > cache.get(self.second)
+
+
+class IndicatorCache:
+    """
+    A class to represent the indicators computed for one version of the historical data of a ticker
+    Every indicator is computed once per version and handed out as a read-only array
+    """
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.data_version = None
+        self.values = {}
+
+    def get(self, indicator):
+        """
+        Get the values of the indicator for the current historical data of the ticker
+        :param indicator: Indicator to get
+        :return: Read-only array with one value per bar
+        """
+        if self.data_version != self.ticker.data_version:
+            # The historical data changed, drop the indicators of the previous version
+            self.values = {}
+            self.data_version = self.ticker.data_version
+
+        if indicator not in self.values:
+            values = np.asarray(indicator.calculate(self.ticker.historical_data, self))
+            values.flags.writeable = False
+            self.values[indicator] = values
+        return self.values[indicator]
@@ -0,0 +1,140 @@
+import io
+import numpy as np
+from PIL import Image
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# -----------------------------------------------------------
+# Output profiles for the rendered plots
+# - dpi and figsize set the image size
+# - compress_level is the PNG compression (0 fastest / largest to 9 slowest / smallest)
+# -----------------------------------------------------------
+PLOT_PROFILES = {
+    "default": {"dpi": 100, "figsize": (6.4, 4.8), "compress_level": 6},
+    "fast": {"dpi": 80, "figsize": (6.4, 4.8), "compress_level": 1},
+    "small": {"dpi": 72, "figsize": (6.4, 4.8), "compress_level": 9},
+    "large": {"dpi": 150, "figsize": (8.0, 6.0), "compress_level": 6},
+}
+
+# Number of bars shown in the plot
+PLOT_BARS = 80
+
+# Templates created in this process, one per profile
+templates = {}
+
+def get_plot_template(profile="default"):
+    """
+    Get the plot template of the profile for this process, it is created on the first use
+    :param profile: Name of the output profile
+    """
+    if profile not in templates:
+        templates[profile] = SatyPivotRibbonPlotTemplate(profile)
+    return templates[profile]
+
+
+class SatyPivotRibbonPlotTemplate:
+    """
+    A class to represent a pre-laid-out figure for the Saty Pivot Ribbon plot
+    The figure, axes, EMA lines and volume bars are created once, every render only updates their data
+    and replaces the clouds and annotations. The layout is computed once when the template is created.
+    """
+    def __init__(self, profile="default"):
+        self.profile = PLOT_PROFILES[profile]
+
+        self.fig, (self.ax, self.ax1) = plt.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [4, 1]}, figsize=self.profile["figsize"], dpi=self.profile["dpi"])
+        ax, ax1 = self.ax, self.ax1
+        x = np.arange(PLOT_BARS)
+        placeholder = np.zeros(PLOT_BARS)
+
+        # EMA lines
+        self.close_line, = ax.plot(x, placeholder, label='Close Price', color='black', alpha=0.3)
+        self.fast_line, = ax.plot(x, placeholder, label='Fast EMA (8)', color='green')
+        self.pivot_line, = ax.plot(x, placeholder, label='Pivot EMA (21)', color='blue')
+        self.slow_line, = ax.plot(x, placeholder, label='Slow EMA (34)', color='red')
+        ax.set_ylabel('Price')
+
+        # Volume bars
+        self.bars = ax1.bar(x, placeholder, color='grey', alpha=0.3).patches
+        ax1.set_xlabel('5min TICKS')
+        ax1.set_ylabel('Volume')
+        ax1.grid(True)
+
+        # Final plot adjustments
+        plt.setp(ax1.get_xticklabels(), rotation=45)
+
+        # Lay out the figure once with wide tick labels, the layout is kept for every render
+        ax.set_ylim(10000, 99999)
+        ax1.set_ylim(0, 1e8)
+        self.fig.tight_layout()
+        ax.autoscale(enable=True)
+        ax1.autoscale(enable=True)
+
+        # Clouds and annotations of the last render
+        self.artists = []
+
+    def render(self, plot_data):
+        """
+        Render the plot data into PNG image bytes
+        :param plot_data: Data returned by SignalSatypePivotRibbon.get_plot_data
+        """
+        ax, ax1 = self.ax, self.ax1
+        x = plot_data["x"]
+        fast_ema = plot_data["fast_ema"]
+        pivot_ema = plot_data["pivot_ema"]
+        slow_ema = plot_data["slow_ema"]
+
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+
+        # Update the EMA lines
+        self.close_line.set_data(x, plot_data["close"])
+        self.fast_line.set_data(x, fast_ema)
+        self.pivot_line.set_data(x, pivot_ema)
+        self.slow_line.set_data(x, slow_ema)
+
+        # Fill between EMAs to create 'clouds'
+        self.artists.append(ax.fill_between(x, fast_ema, pivot_ema, where=(fast_ema >= pivot_ema), facecolor='green', alpha=0.5, label='Bullish Fast Cloud'))
+        self.artists.append(ax.fill_between(x, fast_ema, pivot_ema, where=(fast_ema < pivot_ema), facecolor='red', alpha=0.5, label='Bearish Fast Cloud'))
+        self.artists.append(ax.fill_between(x, pivot_ema, slow_ema, where=(pivot_ema >= slow_ema), facecolor='blue', alpha=0.5, label='Bullish Slow Cloud'))
+        self.artists.append(ax.fill_between(x, pivot_ema, slow_ema, where=(pivot_ema < slow_ema), facecolor='orange', alpha=0.5, label='Bearish Slow Cloud'))
+
+        # Plot conviction based on pivot EMA (21)
+        for date, is_bullish in plot_data["cloud_transitions"]:
+            if is_bullish:
+                self.artists.append(ax.annotate('^ Clouds', xy=(date, slow_ema[date]), xytext=(date, slow_ema[date] * 0.995), arrowprops=dict(facecolor='green', shrink=0.005)))
+            else:
+                self.artists.append(ax.annotate('v Clouds', xy=(date, slow_ema[date]), xytext=(date, slow_ema[date] * 1.005), arrowprops=dict(facecolor='red', shrink=0.005)))
+
+        # Plot Conviction Arrows based on 13 & 48 EMA
+        for date, is_bullish in plot_data["conviction_transitions"]:
+            if is_bullish:
+                self.artists.append(ax.annotate('^ Conviction', xy=(date, slow_ema[date]), xytext=(date, slow_ema[date] * 0.995), arrowprops=dict(facecolor='green', shrink=0.005)))
+            else:
+                self.artists.append(ax.annotate('v Conviction', xy=(date, fast_ema[date]), xytext=(date, fast_ema[date] * 1.005), arrowprops=dict(facecolor='red', shrink=0.005)))
+
+        # Update the volume bars, the bars without data are hidden
+        volume = plot_data["volume"]
+        volume_color = plot_data["volume_color"]
+        for i, bar in enumerate(self.bars):
+            if i < len(x):
+                bar.set_height(volume[i])
+                bar.set_facecolor(volume_color[i])
+                bar.set_visible(True)
+            else:
+                bar.set_visible(False)
+
+        # Rescale the axes to the new data, the price from the lines and the bars directly
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+        margin = 0.05 * (len(x) - 0.2)
+        ax.set_xlim(-0.4 - margin, len(x) - 0.6 + margin)
+        ax1.set_ylim(0, max(float(volume.max()), 1.0) * 1.05)
+
+        # Draw once and save the plot to a BytesIO object
+        self.fig.canvas.draw()
+        buf = io.BytesIO()
+        Image.frombuffer("RGBA", self.fig.canvas.get_width_height(), self.fig.canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(buf, format='png', compress_level=self.profile["compress_level"])
+        return buf.getvalue()
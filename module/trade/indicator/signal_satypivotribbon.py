@@ -1,11 +1,11 @@
 from module.trade.signals import SignalBase
+from module.trade.indicator.ema_state import EMAStateEngine
+from module.trade.indicator.indicators import EMA, Above
+from module.trade.indicator.plot_template import get_plot_template
+from module.flow.pipeline_metrics import get_pipeline_metrics
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import pytz
-import io
+import numpy as np
+import pandas as pd
 
 class SignalSatypePivotRibbon(SignalBase):
     """
@@ -16,7 +16,7 @@ class SignalSatypePivotRibbon(SignalBase):
     Candle Bias: The script optionally modifies the color of the candlesticks based on their position relative to a bias EMA, adding another layer of trend indication.
     """
 
-    def __init__(self, fast_ema=8, pivot_ema=21, slow_ema=34, fast_conviction_ema=13, slow_conviction_ema=48, bias_ema=21):
+    def __init__(self, fast_ema=8, pivot_ema=21, slow_ema=34, fast_conviction_ema=13, slow_conviction_ema=48, bias_ema=21, plot_profile="default"):
         super().__init__()
         # Apply EMA calculations
         self.signal_name = "EMA_Reversal"
@@ -26,56 +26,73 @@ class SignalSatypePivotRibbon(SignalBase):
         self.fast_conviction_ema = fast_conviction_ema
         self.slow_conviction_ema = slow_conviction_ema
         self.bias_ema = bias_ema
+        self.plot_profile = plot_profile
+        self.ema_engine = EMAStateEngine({
+            "fast": fast_ema,
+            "pivot": pivot_ema,
+            "slow": slow_ema,
+            "fast_conviction": fast_conviction_ema,
+            "slow_conviction": slow_conviction_ema,
+            "bias": bias_ema,
+        })
+
+        # EMAs and conviction used for the plot
+        self.indicators = {
+            'Fast_EMA': EMA(fast_ema),
+            'Pivot_EMA': EMA(pivot_ema),
+            'Slow_EMA': EMA(slow_ema),
+            'Fast_Conviction_EMA': EMA(fast_conviction_ema),
+            'Slow_Conviction_EMA': EMA(slow_conviction_ema),
+            'Bias_EMA': EMA(bias_ema),
+            'Bullish_Conviction': Above(EMA(fast_conviction_ema), EMA(slow_conviction_ema)),
+            'Bearish_Conviction': Above(EMA(slow_conviction_ema), EMA(fast_conviction_ema)),
+        }
 
-    def __calculate_ema(self, prices, period):
+    def __state_transitions(self, bullish, bearish):
         """
-        Calculate the Exponential Moving Average for the given prices
-        :param prices: Prices for which the EMA needs to be calculated
-        :param period: Period for which the EMA needs to be calculated
-        :return: EMA for the given prices
+        Find the bars where the state changes, bars that are neither bullish nor bearish keep the previous state
+        :param bullish: Boolean array of the bullish bars
+        :param bearish: Boolean array of the bearish bars
+        :return: Tuple of the positions of the changes and whether the new state is bullish
         """
-        return prices.ewm(span=period, adjust=False).mean()
-    
+        state = pd.Series(np.where(bullish, 1.0, np.where(bearish, -1.0, np.nan))).ffill()
+        changed = state.notna() & (state != state.shift())
+        positions = np.flatnonzero(changed.to_numpy())
+        return positions, state.to_numpy()[positions] > 0
+
     def compute(self, ticker):
         
         # Get the historical data for the ticker
         df = ticker.historical_data
 
-        # Calculate the EMAs
-        df['Fast_EMA'] = self.__calculate_ema(df['Close'], self.fast_ema)
-        df['Pivot_EMA'] = self.__calculate_ema(df['Close'], self.pivot_ema)
-        df['Slow_EMA'] = self.__calculate_ema(df['Close'], self.slow_ema)
-        df['Fast_Conviction_EMA'] = self.__calculate_ema(df['Close'], self.fast_conviction_ema)
-        df['Slow_Conviction_EMA'] = self.__calculate_ema(df['Close'], self.slow_conviction_ema)
-        df['Bias_EMA'] = self.__calculate_ema(df['Close'], self.bias_ema)
-
-        # Determine bullish or bearish conviction
-        df['Bullish_Conviction'] = df['Fast_Conviction_EMA'] > df['Slow_Conviction_EMA']
-        df['Bearish_Conviction'] = df['Fast_Conviction_EMA'] < df['Slow_Conviction_EMA']
-
         # Determine bullish or bearish trend
         cache = self.read_cache(ticker.symbol, self.signal_name)
         pivot_last_state = cache.get("pivot_last_state", None)
         conviction_last_state = cache.get("conviction_last_state", None)
         #print(cache)
 
+        # Update the EMAs with the bars after the last cached EMA state
+        with get_pipeline_metrics().time("indicators", ticker.symbol):
+            ema_state, ema = self.ema_engine.update(cache.get("ema_state", {}), df)
+        ema_state_changed = ema_state != cache.get("ema_state", {})
+        cache["ema_state"] = ema_state
 
         row = df.iloc[-1]
 
         # find conviction based on pivot EMA (21)
         # Check the state of last element in df.itemrows() and compare with the current state
         pivot_current_state = pivot_last_state
-        if row['Fast_EMA'] >= row['Pivot_EMA'] and row['Pivot_EMA'] >= row['Slow_EMA']:
+        if ema['fast'] >= ema['pivot'] and ema['pivot'] >= ema['slow']:
             pivot_current_state = "bullish_cloud"
-        elif row['Fast_EMA'] < row['Pivot_EMA'] and row['Pivot_EMA'] <= row['Slow_EMA']:
+        elif ema['fast'] < ema['pivot'] and ema['pivot'] <= ema['slow']:
             pivot_current_state = "bearish_cloud"
 
         # find conviction based on bias EMA (13 & 48)
         # Check the state of last element in df.itemrows() and compare with the current state
         conviction_current_state = conviction_last_state
-        if row["Bullish_Conviction"]:
+        if ema['fast_conviction'] > ema['slow_conviction']:
             conviction_current_state = "bullish"
-        elif row["Bearish_Conviction"]:
+        elif ema['fast_conviction'] < ema['slow_conviction']:
             conviction_current_state = "bearish"
 
         # If one of the conviction state changes, then it is a signal
@@ -105,6 +122,10 @@ Conviction State {self.fast_conviction_ema}ema & {self.slow_conviction_ema}ema:
 """,
             }
         
+        # Persist the EMA state so that a restart resumes from it
+        if ema_state_changed:
+            self.write_cache(ticker.symbol, self.signal_name, cache)
+
         return {
             "signal": False,
             "name": self.signal_name,
@@ -115,103 +136,84 @@ Conviction State {self.fast_conviction_ema}ema & {self.slow_conviction_ema}ema:
             "message": None,
         }
     
-    def compute_and_plot(self, ticker):
+    def compute_history(self, ticker):
         """
-        Compute & Plot the signal
+        Find all the conviction changes (13 & 48 EMA) over the historical data of the ticker
+        The initial conviction is not a change, the first signal is the first reversal after it
+        :return: DataFrame with the Datetime, kind (Buy/Sell) and price of every signal
         """
-        # Get the historical data for the ticker
         df = ticker.historical_data
+        indicators = self.get_indicators(ticker)
+        positions, bullish = self.__state_transitions(indicators['Bullish_Conviction'], indicators['Bearish_Conviction'])
+        positions, bullish = positions[1:], bullish[1:]
 
-        # Calculate the EMAs
-        df['Fast_EMA'] = self.__calculate_ema(df['Close'], self.fast_ema)
-        df['Pivot_EMA'] = self.__calculate_ema(df['Close'], self.pivot_ema)
-        df['Slow_EMA'] = self.__calculate_ema(df['Close'], self.slow_ema)
-        df['Fast_Conviction_EMA'] = self.__calculate_ema(df['Close'], self.fast_conviction_ema)
-        df['Slow_Conviction_EMA'] = self.__calculate_ema(df['Close'], self.slow_conviction_ema)
-        df['Bias_EMA'] = self.__calculate_ema(df['Close'], self.bias_ema)
+        return pd.DataFrame({
+            "Datetime": df['Datetime'].iloc[positions].array,
+            "kind": np.where(bullish, "Buy", "Sell"),
+            "price": df['Close'].to_numpy()[positions].astype('float64'),
+        })
 
-        # Determine bullish or bearish conviction
-        df['Bullish_Conviction'] = df['Fast_Conviction_EMA'] > df['Slow_Conviction_EMA']
-        df['Bearish_Conviction'] = df['Fast_Conviction_EMA'] < df['Slow_Conviction_EMA']
+    def get_plot_key(self):
+        """
+        Get the key identifying the plots of this signal and its parameters, used to cache the rendered plots
+        """
+        return f"{self.signal_name}({self.fast_ema},{self.pivot_ema},{self.slow_ema},{self.fast_conviction_ema},{self.slow_conviction_ema},{self.bias_ema})/{self.plot_profile}"
+
+    def get_plot_data(self, ticker):
+        """
+        Get the data needed to plot the signal
+        :return: Dictionary of plain arrays that can be sent to a rendering process
+        """
+        # Get the historical data for the ticker with the shared EMAs and conviction
+        # The historical data of the ticker is shared with the other signals, so the columns are added to a copy
+        df = ticker.historical_data[['Close', 'Volume']].copy()
+        for name, values in self.get_indicators(ticker).items():
+            df[name] = values
 
         # determine the bullish or bearish volume trend
-        volume_color = ['grey']
-        for i in range(1, len(df['Close'])):
-            if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-                volume_color.append('green')
-            elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-                volume_color.append('red')
-            else:
-                volume_color.append(volume_color[-1]) # same as the previous color
-        df['Volume_Color'] = volume_color
+        # An unchanged close keeps the color of the previous bar, grey until the first change
+        direction = np.sign(df['Close'].diff().to_numpy())
+        direction = pd.Series(np.where(direction == 0, np.nan, direction)).ffill().to_numpy()
+        df['Volume_Color'] = np.where(direction > 0, 'green', np.where(direction < 0, 'red', 'grey'))
 
         # From the dataframe, get only the last 80 elements as a sample dataframe
         # Remove the Index
         df = df.tail(80)
         df.reset_index(inplace=True)
 
-        # Plotting
-        fig, (ax, ax1) = plt.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [4, 1]})
-
-        # Plot EMAs
-        ax.plot(df.index, df['Close'], label='Close Price', color='black', alpha=0.3)
-        ax.plot(df.index, df['Fast_EMA'], label='Fast EMA (8)', color='green')
-        ax.plot(df.index, df['Pivot_EMA'], label='Pivot EMA (21)', color='blue')
-        ax.plot(df.index, df['Slow_EMA'], label='Slow EMA (34)', color='red')
-
-        # Fill between EMAs to create 'clouds'
-        ax.fill_between(df.index, df['Fast_EMA'], df['Pivot_EMA'], where=(df['Fast_EMA'] >= df['Pivot_EMA']), facecolor='green', alpha=0.5, label='Bullish Fast Cloud')
-        ax.fill_between(df.index, df['Fast_EMA'], df['Pivot_EMA'], where=(df['Fast_EMA'] < df['Pivot_EMA']), facecolor='red', alpha=0.5, label='Bearish Fast Cloud')
-        ax.fill_between(df.index, df['Pivot_EMA'], df['Slow_EMA'], where=(df['Pivot_EMA'] >= df['Slow_EMA']), facecolor='blue', alpha=0.5, label='Bullish Slow Cloud')
-        ax.fill_between(df.index, df['Pivot_EMA'], df['Slow_EMA'], where=(df['Pivot_EMA'] < df['Slow_EMA']), facecolor='orange', alpha=0.5, label='Bearish Slow Cloud')
-
-        # Plot conviction based on pivot EMA (21)
-        pivot_last_state = None
-        for date, row in df.iterrows():
-            if row['Fast_EMA'] >= row['Pivot_EMA'] and row['Pivot_EMA'] >= row['Slow_EMA'] and pivot_last_state != 'bullish cloud':
-                ax.annotate('^ Clouds', xy=(date, row['Slow_EMA']), xytext=(date, row['Slow_EMA'] * 0.995), arrowprops=dict(facecolor='green', shrink=0.005))
-                pivot_last_state = 'bullish cloud'
-            elif row['Fast_EMA'] < row['Pivot_EMA'] and row['Pivot_EMA'] < row['Slow_EMA'] and pivot_last_state != 'bearish cloud':
-                ax.annotate('v Clouds', xy=(date, row['Slow_EMA']), xytext=(date, row['Slow_EMA'] * 1.005), arrowprops=dict(facecolor='red', shrink=0.005))
-                pivot_last_state = 'bearish cloud'
-
-        # Plot Conviction Arrows based on 13 & 48 EMA
-        last_state = None
-        for date, row in df.iterrows():
-            # find if it is currently bullish or bearish and only when there is a state change from last, make a annotation
-            if row['Bullish_Conviction'] and last_state != 'bullish':
-                ax.annotate('^ Conviction', xy=(date, row['Slow_EMA']), xytext=(date, row['Slow_EMA'] * 0.995), arrowprops=dict(facecolor='green', shrink=0.005))
-                last_state = 'bullish'
-            elif row['Bearish_Conviction'] and last_state != 'bearish':
-                ax.annotate('v Conviction', xy=(date, row['Fast_EMA']), xytext=(date, row['Fast_EMA'] * 1.005), arrowprops=dict(facecolor='red', shrink=0.005))
-                last_state = 'bearish'
-
-        ax.set_ylabel('Price')
-
-        #Axis2 with bar plot
-        ax1.bar(df.index, df['Volume'], color=df['Volume_Color'], alpha=0.3)
-        ax1.set_xlabel('5min TICKS')
-        ax1.set_ylabel('Volume')
-        ax1.grid(True)
-
-        # Final plot adjustments
-        #ax.legend()
-        plt.xticks(rotation=45)
-        #plt.title('Saty Pivot Ribbon Simulation')
-        plt.xlabel('5min TICKS')
-        
-        plt.grid(True)
-
-        # Adjust layout to prevent overlap
-        plt.tight_layout()
-        #plt.show()
+        fast_ema = df['Fast_EMA'].to_numpy()
+        pivot_ema = df['Pivot_EMA'].to_numpy()
+        slow_ema = df['Slow_EMA'].to_numpy()
 
-        # Save the plot to a BytesIO object
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)  # Rewind the buffer to the beginning so it can be read from
-        plt.close()  # Close the plot figure to free up memory
+        # Find the changes of the pivot cloud (8, 21 & 34 EMA) and of the conviction (13 & 48 EMA)
+        cloud_positions, cloud_bullish = self.__state_transitions(
+            (fast_ema >= pivot_ema) & (pivot_ema >= slow_ema),
+            (fast_ema < pivot_ema) & (pivot_ema < slow_ema)
+        )
+        conviction_positions, conviction_bullish = self.__state_transitions(
+            df['Bullish_Conviction'].to_numpy(),
+            df['Bearish_Conviction'].to_numpy()
+        )
 
         return {
-            "buf": buf
-        }
\ No newline at end of file
+            "x": df.index.to_numpy(),
+            "close": df['Close'].to_numpy(),
+            "volume": df['Volume'].to_numpy(),
+            "volume_color": df['Volume_Color'].to_numpy(),
+            "fast_ema": fast_ema,
+            "pivot_ema": pivot_ema,
+            "slow_ema": slow_ema,
+            "cloud_transitions": list(zip(cloud_positions.tolist(), cloud_bullish.tolist())),
+            "conviction_transitions": list(zip(conviction_positions.tolist(), conviction_bullish.tolist())),
+            "profile": self.plot_profile,
+        }
+
+    @staticmethod
+    def render_plot(plot_data):
+        """
+        Render the plot of the signal
+        Static so that it can run in a rendering process, the figure template of the process is reused
+        :param plot_data: Data returned by get_plot_data
+        :return: PNG image bytes
+        """
+        return get_plot_template(plot_data["profile"]).render(plot_data)
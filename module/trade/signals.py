@@ -1,5 +1,6 @@
-import os
-import json
+import io
+
+from module.trade.state_store import get_state_store
 
 # Create a base class for the signals
 
@@ -9,54 +10,42 @@ class SignalBase:
     """
     def __init__(self) -> None:
         self.signal_name = "base"
-        pass
-
-    def __read_all_cache(self, symbol):
-        """
-        Read the cache data from the cache file (symbol.cache) present under the .data folder for the ticker
-        """
-        
-        # Read the cache data from the cache file which is a JSON file and store the data as a dictionary
-        # If the folder or file is not present, create a empty dictionary and a empty file
-        all_data = {}
-        try:
-            # check for the folder present and if not present create the folder
-            if not os.path.exists('.data'):
-                os.makedirs('.data')
+        # Indicators used by the signal (name: Indicator), computed once per ticker data version and shared between signals
+        self.indicators = {}
 
-            with open(f'.data/{symbol}.json', 'r') as cache_file:
-                cache_data = cache_file.read()
-                all_data = json.loads(cache_data)
-        except FileNotFoundError:
-            with open(f'.data/{symbol}.json', 'w') as cache_file:
-                cache_file.write(json.dumps(all_data))
-        except json.decoder.JSONDecodeError:
-            all_data = {}
-        return all_data
+    @property
+    def state_store(self):
+        """
+        State of the signal for every symbol, shared by all the signals of the process
+        It is opened on the first use, so that a signal sent to another process (backtest) does not open the database
+        """
+        return get_state_store()
 
     def read_cache(self, symbol, signal_name):
         """
-        Read the cache data from the cache file (symbol.cache) present under the .data folder for the ticker
+        Read the cache data of the signal for the ticker from the state store
         :return: Cache data for the given key
         """
-
-        all_data = self.__read_all_cache(symbol)
-
-        return all_data.get(signal_name, {})
+        return self.state_store.get(symbol, signal_name)
 
     def write_cache(self, symbol, signal_name, data={}):
         """
-        Write the cache data to the cache file (symbol.cache) present under the .data folder for the ticker
+        Write the cache data of the signal for the ticker to the state store, it is saved on the next flush of the store
         """
+        self.state_store.put(symbol, signal_name, data)
 
-        all_data = self.__read_all_cache(symbol)
-
-        # Update the cache data with the new data
-        all_data[signal_name] = data
+    def get_indicators(self, ticker):
+        """
+        Get the declared indicators for the current historical data of the ticker
+        :return: Dictionary of the indicator name and the read-only array of values
+        """
+        return {name: ticker.indicator_cache.get(indicator) for name, indicator in self.indicators.items()}
 
-        # Write the cache data to the cache file which is a JSON file
-        with open(f'.data/{symbol}.json', 'w') as cache_file:
-            cache_file.write(json.dumps(all_data))
+    def get_plot_key(self):
+        """
+        Get the key identifying the plots of this signal and its parameters, used to cache the rendered plots
+        """
+        return self.signal_name
 
     def compute(self, ticker):
         """
@@ -71,8 +60,36 @@ class SignalBase:
         """
         raise NotImplementedError("Subclasses must implement this method")
     
+    def compute_history(self, ticker):
+        """
+        Generate the signals over the whole historical data of the ticker in one pass, without reading or writing the cache
+        return data is a DataFrame with one row per signal and the following columns:
+        - Datetime: The timestamp of the bar at which the signal was generated
+        - kind: The kind of signal generated (Buy/Sell)
+        - price: The close price of the bar
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def get_plot_data(self, ticker):
+        """
+        Get the data needed to plot the signal
+        The returned data must be picklable, so that the plot can be rendered in another process
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    @staticmethod
+    def render_plot(plot_data):
+        """
+        Render the plot data returned by get_plot_data into PNG image bytes
+        Subclasses define it as a static method, so that it can be sent to a rendering process
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
     def compute_and_plot(self, ticker):
         """
         Cmopute & Plot the signal
         """
-        raise NotImplementedError("Subclasses must implement this method")
\ No newline at end of file
+        png = self.render_plot(self.get_plot_data(ticker))
+        return {
+            "buf": io.BytesIO(png)
+        }
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import copy
+import json
+import glob
+import sqlite3
+import threading
+
+# State stores opened in this process, one per database file
+state_stores = {}
+
+def get_state_store(path='.data/signal_state.db'):
+    """
+    Get the state store of the database file for this process, it is opened on the first use
+    :param path: Path of the SQLite database file
+    """
+    if path not in state_stores:
+        state_stores[path] = StateStore(path)
+    return state_stores[path]
+
+
+class StateStore:
+    """
+    A class to represent the signal state of all the symbols kept in one SQLite database (WAL mode)
+    All the state is loaded in memory with one query when the store is opened, reads and writes use the memory,
+    and the changed states are written back with flush in one transaction
+    """
+    def __init__(self, path='.data/signal_state.db'):
+        """
+        :param path: Path of the SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # (symbol, signal_name): state
+        self.states = {}
+        self.dirty = set()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        is_new = not os.path.exists(path)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS signal_state (symbol TEXT NOT NULL, signal_name TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (symbol, signal_name))')
+        self.connection.commit()
+
+        self.__load()
+        if is_new:
+            self.__import_json_files(folder if folder else '.')
+
+    def __load(self):
+        """
+        Load the state of all the symbols in memory
+        """
+        for symbol, signal_name, data in self.connection.execute('SELECT symbol, signal_name, data FROM signal_state'):
+            try:
+                self.states[(symbol, signal_name)] = json.loads(data)
+            except json.decoder.JSONDecodeError:
+                print(f"Ignoring unreadable state of {signal_name} for {symbol}")
+
+    def __import_json_files(self, folder):
+        """
+        Import the per symbol JSON cache files ({symbol}.json) written before the state store existed
+        The files of the other components (like 1_ticker_manager.json) start with a number and an underscore and are skipped
+        """
+        for file_path in glob.glob(os.path.join(folder, '*.json')):
+            symbol = os.path.splitext(os.path.basename(file_path))[0]
+            if symbol[:1].isdigit() and '_' in symbol:
+                continue
+            try:
+                with open(file_path, 'r') as cache_file:
+                    all_data = json.loads(cache_file.read())
+            except (OSError, json.decoder.JSONDecodeError) as e:
+                print(f"Skipping the cache file {file_path}: {e}")
+                continue
+            if not isinstance(all_data, dict):
+                continue
+            for signal_name, data in all_data.items():
+                if isinstance(data, dict):
+                    self.put(symbol, signal_name, data)
+        if len(self.dirty) > 0:
+            print(f"Imported the state of {len(self.dirty)} signals from the JSON cache files")
+            self.flush()
+
+    def get(self, symbol, signal_name):
+        """
+        Get the state of a signal for a symbol
+        :return: Copy of the state, an empty dictionary if there is no state
+        """
+        with self.lock:
+            return copy.deepcopy(self.states.get((symbol, signal_name), {}))
+
+    def put(self, symbol, signal_name, data):
+        """
+        Set the state of a signal for a symbol, it is written to the database on the next flush
+        """
+        with self.lock:
+            self.states[(symbol, signal_name)] = copy.deepcopy(data)
+            self.dirty.add((symbol, signal_name))
+
+    def flush(self):
+        """
+        Write the changed states to the database in one transaction
+        :return: Number of states written
+        """
+        with self.lock:
+            if len(self.dirty) == 0:
+                return 0
+            rows = [(symbol, signal_name, json.dumps(self.states[(symbol, signal_name)])) for symbol, signal_name in self.dirty]
+            try:
+                with self.connection:
+                    self.connection.executemany('INSERT OR REPLACE INTO signal_state (symbol, signal_name, data) VALUES (?, ?, ?)', rows)
+            except sqlite3.Error as e:
+                # The states stay dirty and are written on the next flush
+                print(f"Error writing the signal state: {e}")
+                return 0
+            self.dirty.clear()
+            return len(rows)
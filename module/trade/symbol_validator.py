@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import time
+import threading
+import yfinance as yf
+
+from module.trade.bar_store import BarStore
+
+# Errors of yfinance when Yahoo answered that it has no prices for the symbol, the other errors are failed requests
+NO_DATA_ERROR = re.compile(r'may be delisted|no data found|not found', re.IGNORECASE)
+
+# Validators opened in this process, one per cache file
+symbol_validators = {}
+
+def get_symbol_validator(path='.data/2_symbol_validation.json'):
+    """
+    Get the symbol validator of the cache file for this process, it is created on the first use
+    :param path: Path of the validation cache file
+    """
+    if path not in symbol_validators:
+        symbol_validators[path] = SymbolValidator(path)
+    return symbol_validators[path]
+
+
+class SymbolValidator:
+    """
+    A class to represent a persistent cache of the symbol validations
+    Valid and invalid results are both cached with their own time to live. Symbols in the watchlist
+    or in the bar store are valid without a network call, the other symbols are checked with a short price history
+    """
+    def __init__(self, path='.data/2_symbol_validation.json', valid_ttl_seconds=7 * 24 * 3600, invalid_ttl_seconds=24 * 3600, bar_store=None):
+        """
+        :param path: Path of the validation cache file
+        :param valid_ttl_seconds: Time a valid result is reused
+        :param invalid_ttl_seconds: Time an invalid result is reused
+        :param bar_store: Bar store of the downloaded bars
+        """
+        self.path = path
+        self.valid_ttl_seconds = valid_ttl_seconds
+        self.invalid_ttl_seconds = invalid_ttl_seconds
+        self.bar_store = bar_store if bar_store is not None else BarStore()
+        self.lock = threading.Lock()
+        # Symbols of the watchlist
+        self.known_symbols = set()
+        # symbol: {"valid": bool, "checked_at": epoch seconds}
+        self.results = self.__read_results()
+
+    def __read_results(self):
+        """
+        Read the cached results from the validation cache file
+        """
+        try:
+            with open(self.path, 'r') as cache_file:
+                return json.loads(cache_file.read())
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return {}
+
+    def __write_results(self):
+        """
+        Write the cached results to the validation cache file
+        """
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(f'{self.path}.tmp', 'w') as cache_file:
+            cache_file.write(json.dumps(self.results))
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def add_known_symbols(self, symbols):
+        """
+        Mark the symbols (of the watchlist) as valid
+        """
+        with self.lock:
+            self.known_symbols.update(symbol.upper() for symbol in symbols)
+
+    def get_cached(self, symbol):
+        """
+        Get the validation of the symbol without a network call
+        :return: True / False if known, None if the symbol has to be checked
+        """
+        key = symbol.upper()
+        with self.lock:
+            if key in self.known_symbols:
+                return True
+            result = self.results.get(key, None)
+        if result is not None:
+            ttl_seconds = self.valid_ttl_seconds if result["valid"] else self.invalid_ttl_seconds
+            if time.time() - result["checked_at"] < ttl_seconds:
+                return result["valid"]
+        if self.bar_store.has_symbol(symbol):
+            return True
+        return None
+
+    def check(self, symbol):
+        """
+        Check the symbol with a short price history download
+        :return: True if the symbol has recent prices, False if Yahoo answered that it has no prices for the symbol
+        :raises Exception: If the download fails (network, rate limit, Yahoo down), the result is then not cached
+        """
+        try:
+            # Without raise_errors a failed request returns an empty frame, which cannot be told apart from an invalid symbol
+            stock_data = yf.Ticker(symbol).history(period='5d', auto_adjust=False, actions=False, raise_errors=True)
+        except Exception as e:
+            if NO_DATA_ERROR.search(str(e)) and 'status_code' not in str(e):
+                return False
+            raise
+        return not stock_data.empty
+
+    def is_valid(self, symbol):
+        """
+        Check if the symbol is a valid symbol, using the cached result when possible
+        :return: True if the symbol is valid, False if the symbol is invalid
+        """
+        valid = self.get_cached(symbol)
+        if valid is not None:
+            return valid
+
+        try:
+            valid = self.check(symbol)
+        except Exception as e:
+            print(f"Error validating the symbol {symbol}: {e}")
+            return False
+
+        with self.lock:
+            self.results[symbol.upper()] = {"valid": valid, "checked_at": time.time()}
+            self.__write_results()
+        return valid
@@ -1,8 +1,29 @@
 import yfinance as yf
 import json
 import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+
+from module.trade.bar_cache import BarCache
+from module.trade.bar_store import BarStore
+from module.trade.symbol_validator import get_symbol_validator
+from module.trade.indicator.indicators import IndicatorCache
+
+# Columns kept in the compact historical data of the scan tickers
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+BAR_COLUMNS = PRICE_COLUMNS + ['Volume']
+
+# Scan priority of the symbols without a priority, scanned every bar
+DEFAULT_PRIORITY = 1
+
+# Serializes the grouped yf.download calls
+DOWNLOAD_LOCK = threading.Lock()
+
+# HH:MM label for every minute of the day, indexed by the minute of the day
+TIME_LABELS = np.array([f'{hour:02d}:{minute:02d}' for hour in range(24) for minute in range(60)], dtype=object)
 
 # -----------------------------------------------------------
 # Create a python class for a ticker
@@ -11,9 +32,19 @@ class Ticker:
     """
     A class to represent a stock ticker
     """
-    def __init__(self, symbol):
+    def __init__(self, symbol, bar_cache=None, compact=False):
+        """
+        :param symbol: Symbol of the ticker
+        :param bar_cache: Bar cache of the downloaded bars (default: no cache)
+        :param compact: Keep only the OHLCV columns with float32 prices (used by the scan, the indicators do not need more)
+        """
         self.symbol = symbol
         self.historical_data = None
+        self.bar_cache = bar_cache
+        self.compact = compact
+        # Version of the historical data, the indicators are computed once per version
+        self.data_version = 0
+        self.indicator_cache = IndicatorCache(self)
 
     def get_historical_data(self, start_date, end_date, interval='5m', timezone='America/New_York'):
         """
@@ -24,19 +55,56 @@ class Ticker:
         :param timezone: Timezone for historical data (default: America/New_York)
         :return: Historical data for the given stock ticker
         """
-        stock_data = yf.download(self.symbol, start=start_date, end=end_date, interval=interval)
+        stock_data = self.download_historical_data(start_date, end_date, interval, timezone)
+        return self.update_historical_data(stock_data, start_date, end_date, interval, timezone)
 
+    def download_historical_data(self, start_date, end_date, interval='5m', timezone='America/New_York'):
+        """
+        Download the bars missing from the bar cache, the ticker and the bar cache are not changed
+        :param start_date: Start date for historical data (YYYY-MM-DD)
+        :param end_date: End date for historical data (YYYY-MM-DD)
+        :return: Data returned by yfinance, to pass to update_historical_data
+        """
+        fetch_start = self.get_fetch_start(start_date, interval, timezone)
+        # Ticker.history does not share state between calls (unlike yf.download), so tickers can be fetched in parallel threads
+        return yf.Ticker(self.symbol).history(start=fetch_start, end=end_date, interval=interval, auto_adjust=False, actions=False)
 
-        # Define the function to add hours to time
-        def add_hours_to_time(time_str, hours_to_add):
-            # Parse the time string into a datetime object (using a dummy date)
-            time = datetime.strptime(time_str, "%H:%M")
-            # Add the specified number of hours using timedelta
-            new_time = time + timedelta(hours=hours_to_add)
-            # Return the new time in "HH:MM" format
-            return new_time.strftime("%H:%M")
-        
+    def get_fetch_start(self, start_date, interval='5m', timezone='America/New_York'):
+        """
+        Get the start for the download, when the bars are cached only the bars after the last cached bar are downloaded
+        :param start_date: Start date for historical data (YYYY-MM-DD)
+        :return: Start for the download
+        """
+        if self.bar_cache is None:
+            return start_date
+        start = pd.Timestamp(start_date, tz=timezone)
+        fetch_start = self.bar_cache.get_fetch_start(self.symbol, interval, start)
+        if fetch_start == start:
+            return start_date
+        return fetch_start.to_pydatetime()
 
+    def update_historical_data(self, stock_data, start_date, end_date, interval='5m', timezone='America/New_York'):
+        """
+        Merge the downloaded data into the bar cache (if any) and assign the requested range as the historical data
+        :param stock_data: Data returned by yfinance for this ticker
+        :param start_date: Start date for historical data (YYYY-MM-DD)
+        :param end_date: End date for historical data (YYYY-MM-DD)
+        :return: Historical data for the given stock ticker
+        """
+        if self.bar_cache is not None:
+            start = pd.Timestamp(start_date, tz=timezone)
+            end = pd.Timestamp(end_date, tz=timezone)
+            stock_data = self.bar_cache.merge(self.symbol, interval, stock_data, start, end, timezone)
+
+        return self.set_historical_data(stock_data, timezone)
+
+    def set_historical_data(self, stock_data, timezone='America/New_York'):
+        """
+        Normalize the downloaded data and assign it as the historical data of the ticker
+        :param stock_data: Data returned by yfinance for this ticker
+        :param timezone: Timezone for historical data (default: America/New_York)
+        :return: Historical data for the given stock ticker
+        """
         # Convert from UTC to Eastern Time (if data is already tz-aware)
         if stock_data.index.tzinfo is not None:
             stock_data.index = stock_data.index.tz_convert(timezone)
@@ -44,38 +112,41 @@ class Ticker:
             # If for any reason data is tz-naive, localize to UTC and then convert
             stock_data.index = stock_data.index.tz_localize('UTC').tz_convert(timezone)
 
-        new_data = pd.DataFrame()
-        new_data['time'] = stock_data.index.time
-        new_data['time'] = new_data['time'].apply(lambda x: str(x).split(':')[0] + ':' + str(x).split(':')[1])
-        new_data['datetime'] = stock_data.index
-        new_data['offset'] = new_data['datetime'].apply(lambda x: int(str(x).split('-')[-1].split(':')[0]))
+        if self.compact:
+            # Keep only the used columns with compact dtypes
+            stock_data = stock_data[[column for column in BAR_COLUMNS if column in stock_data.columns]].copy()
+            for column in PRICE_COLUMNS:
+                if column in stock_data:
+                    stock_data[column] = stock_data[column].astype('float32')
+            if 'Volume' in stock_data:
+                stock_data['Volume'] = pd.to_numeric(stock_data['Volume'].fillna(0).astype('int64'), downcast='unsigned')
 
-        # Apply the function to each row in the DataFrame
+        # Add the date and time (HH:MM) of every bar
         stock_data['date'] = stock_data.index.date
+        stock_data['time (EDT)'] = TIME_LABELS[stock_data.index.hour.to_numpy() * 60 + stock_data.index.minute.to_numpy()]
+        if stock_data.index.name is None:
+            stock_data.index.name = 'Datetime'
         stock_data.reset_index(inplace=True)
-        #stock_data['time'] = new_data.apply(lambda row: add_hours_to_time(row['time'], row['offset']), axis=1)
-        stock_data['time (EDT)'] = new_data['time']
-
-        # summarize the stock information using pandas function
-        #print(stock_data.head())
-        #print(stock_data.index)
-        #print(stock_data.describe())
 
         self.historical_data = stock_data
+        self.data_version += 1
         return self.historical_data
     
+    def get_last_timestamp(self):
+        """
+        Get the timestamp of the last bar of the historical data
+        :return: Timestamp of the last bar, None if there is no historical data
+        """
+        if self.historical_data is None or len(self.historical_data) == 0:
+            return None
+        return self.historical_data['Datetime'].iloc[-1]
+
     def is_valid_symbol(symbol):
         """
-        Check if the symbol is a valid symbol
+        Check if the symbol is a valid symbol, the result is cached (see SymbolValidator)
         :return: True if the symbol is valid, False if the symbol is invalid
         """
-        try:
-            info = yf.Ticker(symbol).info
-            if len(info) > 1:
-                return True
-            return False
-        except:
-            return False
+        return get_symbol_validator().is_valid(symbol)
 
 # -----------------------------------------------------------
 # Simulation ticker
@@ -84,8 +155,9 @@ class SimTicker(Ticker):
     """
     A class to represent a simulation ticker
     """
-    def __init__(self, symbol):
+    def __init__(self, symbol, bar_store=None):
         super().__init__(symbol)
+        self.bar_store = bar_store if bar_store is not None else BarStore()
 
     def assign_historical_data(self, historical_data):
         """
@@ -95,8 +167,36 @@ class SimTicker(Ticker):
 
         # Create a DataFrame from the historical data
         self.historical_data = historical_data
+        self.data_version += 1
 
         return None
+
+    def load_historical_data(self, start_date=None, end_date=None, interval='5m', timezone='America/New_York'):
+        """
+        Load the historical data for the given range from the bar store
+        :param start_date: Start date for historical data (YYYY-MM-DD), None for the first stored bar
+        :param end_date: End date for historical data (YYYY-MM-DD), None for the last stored bar
+        :return: Historical data for the ticker
+        """
+        start = pd.Timestamp(start_date, tz=timezone) if start_date is not None else None
+        end = pd.Timestamp(end_date, tz=timezone) if end_date is not None else None
+        stock_data = self.bar_store.read(self.symbol, interval, start, end)
+        return self.set_historical_data(stock_data, timezone)
+
+    def replay(self, start_date=None, end_date=None, interval='5m', timezone='America/New_York', window=1000):
+        """
+        Replay the stored bars one at a time, only a window of bars is kept in memory
+        For every bar in the range the historical data is the window of bars ending at that bar
+        :param window: Number of bars in the historical data for every step
+        :return: Generator yielding the ticker after each bar is assigned
+        """
+        start = pd.Timestamp(start_date, tz=timezone) if start_date is not None else None
+        end = pd.Timestamp(end_date, tz=timezone) if end_date is not None else None
+        i, j = self.bar_store.get_range_index(self.symbol, interval, start, end)
+        for position in range(i, j):
+            stock_data = self.bar_store.read_slice(self.symbol, interval, max(0, position + 1 - window), position + 1)
+            self.set_historical_data(stock_data, timezone)
+            yield self
     
 # -----------------------------------------------------------
 # Create a Ticker Manager that manages all Tickers
@@ -106,13 +206,20 @@ class TickerManager:
     A class to represent a ticker manager
     """
     def __init__(self):
+        # Signature (mtime, inode, size) of the tickers file when it was last read, used to detect changes
+        self.file_signature = self.__get_file_signature()
         all_data = self.__read_all_tickers()
-        self.ticker_list = all_data.get('ticker_list', [])
+        self.version = all_data.get('version', 0)
+        self.ticker_list = list(dict.fromkeys(all_data.get('ticker_list', [])))
+        # Scan priority per symbol (see get_scan_symbols), the symbols not listed have the default priority
+        self.priorities = all_data.get('priorities', {})
         self.ticker_obj_list = {}
+        self.bar_cache = BarCache()
 
         # Instantiate the ticker from ticker list
         for ticker in self.ticker_list:
-            self.ticker_obj_list[ticker] = Ticker(ticker)
+            self.ticker_obj_list[ticker] = Ticker(ticker, self.bar_cache, compact=True)
+        get_symbol_validator().add_known_symbols(self.ticker_list)
 
     def __read_all_tickers(self):
         """
@@ -142,9 +249,22 @@ class TickerManager:
         Write the tickers data to the tickers file (tickers.json) present under the .data folder
         """
         file_name = '1_ticker_manager.json'
-        # Write the tickers data to the tickers file which is a JSON file
-        with open(f'.data/{file_name}', 'w') as tickers_file:
+        # Every change increases the version, so that the ticker managers reading the file reload it
+        data['version'] = data.get('version', 0) + 1
+        # Write the tickers data to a temporary file and replace the tickers file, so that a reader never sees a partial file
+        with open(f'.data/{file_name}.tmp', 'w') as tickers_file:
             tickers_file.write(json.dumps(data))
+        os.replace(f'.data/{file_name}.tmp', f'.data/{file_name}')
+
+    def __get_file_signature(self):
+        """
+        Get the modification time, inode and size of the tickers file, None if the file is not present
+        """
+        try:
+            stat = os.stat('.data/1_ticker_manager.json')
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
 
     def add_ticker(self, symbol):
         """
@@ -156,7 +276,7 @@ class TickerManager:
         # Check if the ticker is already in the ticker list
         if symbol not in self.ticker_list:
             self.ticker_list.append(symbol)
-            self.ticker_obj_list[symbol] = Ticker(symbol)
+            self.ticker_obj_list[symbol] = Ticker(symbol, self.bar_cache, compact=True)
             return {
                 "status": True,
                 "message": f"Ticker {symbol} added successfully"
@@ -187,9 +307,12 @@ class TickerManager:
         if symbol not in self.ticker_list:
             # Check if the symbol is valid
             if Ticker.is_valid_symbol(symbol):
+                # Add to the list in the file, it has the changes which are not synced yet
                 all_data = self.__read_all_tickers()
-                all_data['ticker_list'] = self.ticker_list + [symbol]
-                self.__write_all_tickers(all_data)
+                file_ticker_list = all_data.get('ticker_list', [])
+                if symbol not in file_ticker_list:
+                    all_data['ticker_list'] = file_ticker_list + [symbol]
+                    self.__write_all_tickers(all_data)
                 return  { "status": True, "message": f"Ticker {symbol} added successfully"}
             else:
                 return { "status": False, "message": f"Ticker {symbol} is not a valid symbol"}
@@ -202,26 +325,237 @@ class TickerManager:
         """
         if symbol in self.ticker_list:
             all_data = self.__read_all_tickers()
-            all_data['ticker_list'] = [ticker for ticker in self.ticker_list if ticker != symbol]
+            all_data['ticker_list'] = [ticker for ticker in all_data.get('ticker_list', []) if ticker != symbol]
+            all_data.get('priorities', {}).pop(symbol, None)
             self.__write_all_tickers(all_data)
             return { "status": True, "message": f"Ticker {symbol} removed successfully"}
         return { "status": False, "message": f"Ticker {symbol} not present in the existing list"}
 
+    def lazy_add_tickers(self, symbols, max_workers=16):
+        """
+        Adds many tickers to the ticker manager file, the symbols are validated concurrently and the file is written once
+        :param symbols: Symbols for the tickers
+        :param max_workers: Number of symbols validated at the same time
+        :return: Dictionary with the status, message, added symbols and rejected symbols (symbol: reason)
+        """
+        all_data = self.__read_all_tickers()
+        file_ticker_list = all_data.get('ticker_list', [])
+        present = set(self.ticker_list) | set(file_ticker_list)
+
+        rejected = {}
+        candidates = []
+        for symbol in dict.fromkeys(symbols):
+            if symbol in present:
+                rejected[symbol] = "already present in the existing list"
+            else:
+                candidates.append(symbol)
+
+        # Validation waits on the network, the symbols are checked in parallel threads
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(candidates)))) as executor:
+            validations = list(executor.map(Ticker.is_valid_symbol, candidates))
+        added = [symbol for symbol, valid in zip(candidates, validations) if valid]
+        rejected.update({symbol: "not a valid symbol" for symbol, valid in zip(candidates, validations) if not valid})
+
+        if len(added) > 0:
+            all_data['ticker_list'] = file_ticker_list + added
+            self.__write_all_tickers(all_data)
+        return {
+            "status": len(added) > 0,
+            "message": f"{len(added)} tickers added, {len(rejected)} tickers rejected",
+            "added": added,
+            "rejected": rejected
+        }
+
+    def lazy_remove_tickers(self, symbols):
+        """
+        Removes many tickers from the ticker manager file, the file is written once
+        :param symbols: Symbols for the tickers
+        :return: Dictionary with the status, message, removed symbols and rejected symbols (symbol: reason)
+        """
+        all_data = self.__read_all_tickers()
+        file_ticker_list = all_data.get('ticker_list', [])
+        present = set(self.ticker_list) | set(file_ticker_list)
+
+        removed = [symbol for symbol in dict.fromkeys(symbols) if symbol in present]
+        rejected = {symbol: "not present in the existing list" for symbol in dict.fromkeys(symbols) if symbol not in present}
+
+        if len(removed) > 0:
+            removed_set = set(removed)
+            all_data['ticker_list'] = [ticker for ticker in file_ticker_list if ticker not in removed_set]
+            all_data['priorities'] = {symbol: priority for symbol, priority in all_data.get('priorities', {}).items() if symbol not in removed_set}
+            self.__write_all_tickers(all_data)
+        return {
+            "status": len(removed) > 0,
+            "message": f"{len(removed)} tickers removed, {len(rejected)} tickers rejected",
+            "removed": removed,
+            "rejected": rejected
+        }
+
+    def lazy_set_priority(self, symbol, priority):
+        """
+        Set the scan priority of the ticker in the ticker manager file
+        :param symbol: Symbol for the ticker
+        :param priority: 0 scans every bar in the first shard, 1 scans every bar (default), N scans every N bars
+        """
+        if symbol not in self.ticker_list:
+            return { "status": False, "message": f"Ticker {symbol} not present in the existing list"}
+        if priority < 0:
+            return { "status": False, "message": f"Priority {priority} is not valid, use 0, 1 or the number of bars between scans"}
+        all_data = self.__read_all_tickers()
+        priorities = all_data.get('priorities', {})
+        if priority == DEFAULT_PRIORITY:
+            priorities.pop(symbol, None)
+        else:
+            priorities[symbol] = priority
+        all_data['priorities'] = priorities
+        self.__write_all_tickers(all_data)
+        return { "status": True, "message": f"Ticker {symbol} priority set to {priority}"}
+
+    def get_priority(self, symbol):
+        """
+        Get the scan priority of the ticker
+        """
+        return self.priorities.get(symbol, DEFAULT_PRIORITY)
+
+    def get_scan_symbols(self, bar_index=0, shard=0, shard_count=1):
+        """
+        Get the symbols to scan in a shard of a bar
+        The watchlist is split in shard_count shards run one after the other during the bar interval:
+        - priority 0 symbols are scanned every bar in the first shard, right after the bar close
+        - priority 1 symbols are scanned every bar, dealt evenly across the shards
+        - priority N symbols are scanned every N bars, dealt evenly across the shards of N bars
+        :param bar_index: Number of the bar (bars since the epoch)
+        :param shard: Number of the shard (0 to shard_count - 1)
+        :param shard_count: Number of shards per bar
+        :return: List of symbols
+        """
+        # Symbols of every priority are dealt in the order of a stable hash, so that the shards do not depend on the order of the watchlist
+        tiers = {}
+        for symbol in sorted(self.ticker_list, key=lambda symbol: hashlib.md5(symbol.encode('utf-8')).digest()):
+            tiers.setdefault(self.get_priority(symbol), []).append(symbol)
+
+        symbols = []
+        for priority, tier_symbols in tiers.items():
+            if priority == 0:
+                if shard == 0:
+                    symbols += tier_symbols
+                continue
+            # Slot of the shard among the shards of the priority period
+            slot = (bar_index % priority) * shard_count + shard
+            symbols += tier_symbols[slot::priority * shard_count]
+        return symbols
+
     def sync_tickers(self):
         """
-        Read the tickers data from the tickers file (tickers.json) present under the .data folder
-        If there are any new symbol or removed symbol, update the ticker list and the ticker object list
-        """ 
+        Read the tickers data from the tickers file (tickers.json) present under the .data folder if it changed since the last read
+        If there are any new symbol or removed symbol, update the ticker list and the ticker object list,
+        the ticker objects (with their cached data) of the unchanged symbols are kept
+        :return: True if the ticker list changed
+        """
+        file_signature = self.__get_file_signature()
+        if file_signature is not None and file_signature == self.file_signature:
+            return False
+        self.file_signature = file_signature
+
         all_data = self.__read_all_tickers()
-        new_ticker_list = all_data.get('ticker_list', [])
-        for symbol in new_ticker_list:
-            if symbol not in self.ticker_list:
-                self.ticker_list.append(symbol)
-                self.ticker_obj_list[symbol] = Ticker(symbol)
-        for symbol in self.ticker_list:
-            if symbol not in new_ticker_list:
-                self.ticker_list.remove(symbol)
-                del self.ticker_obj_list[symbol]
+        version = all_data.get('version', 0)
+        new_ticker_list = list(dict.fromkeys(all_data.get('ticker_list', [])))
+        if version == self.version and new_ticker_list == self.ticker_list:
+            return False
+        self.version = version
+        self.priorities = all_data.get('priorities', {})
+
+        new_symbols = set(new_ticker_list)
+        old_symbols = set(self.ticker_list)
+        for symbol in new_symbols - old_symbols:
+            self.ticker_obj_list[symbol] = Ticker(symbol, self.bar_cache, compact=True)
+        for symbol in old_symbols - new_symbols:
+            del self.ticker_obj_list[symbol]
+        self.ticker_list = new_ticker_list
+        get_symbol_validator().add_known_symbols(new_symbols)
+        return True
+
+    def get_batch_historical_data(self, symbols, start_date, end_date, interval='5m', timezone='America/New_York'):
+        """
+        Get historical data for a group of tickers with grouped downloads
+        The grouped result is split per symbol and assigned to each ticker object, a failure for one symbol does not affect the others
+        :param symbols: Symbols (present in the ticker manager) to download together
+        :param start_date: Start date for historical data (YYYY-MM-DD)
+        :param end_date: End date for historical data (YYYY-MM-DD)
+        :param interval: Interval for historical data (default: 5m)
+        :param timezone: Timezone for historical data (default: America/New_York)
+        :return: Dictionary of the failed symbols and the reason of the failure
+        """
+        downloads, failed = self.download_batch_historical_data(symbols, start_date, end_date, interval, timezone)
+        failed.update(self.update_batch_historical_data(downloads, start_date, end_date, interval, timezone))
+        return failed
+
+    def download_batch_historical_data(self, symbols, start_date, end_date, interval='5m', timezone='America/New_York'):
+        """
+        Download the bars missing from the bar cache for a group of tickers, the tickers and the bar cache are not changed
+        :param symbols: Symbols (present in the ticker manager) to download together
+        :param start_date: Start date for historical data (YYYY-MM-DD)
+        :param end_date: End date for historical data (YYYY-MM-DD)
+        :return: Tuple of the downloads (list of the symbols, whether they need the full range, grouped data),
+            to pass to update_batch_historical_data, and the dictionary of the failed symbols and the reason of the failure
+        """
+        downloads = []
+        failed = {}
+
+        # Tickers without cached bars need the full range, the others only the bars after their last cached bar
+        # Download them separately so that a new ticker does not force the full range for the whole group
+        full_symbols = []
+        tail_symbols = []
+        tail_starts = []
+        for symbol in symbols:
+            fetch_start = self.ticker_obj_list[symbol].get_fetch_start(start_date, interval, timezone)
+            if fetch_start == start_date:
+                full_symbols.append(symbol)
+            else:
+                tail_symbols.append(symbol)
+                tail_starts.append(fetch_start)
+
+        for group, full, fetch_start in [(full_symbols, True, start_date), (tail_symbols, False, min(tail_starts, default=None))]:
+            if len(group) == 0:
+                continue
+
+            try:
+                # yf.download keeps its results in module level state, only one grouped download can run at a time
+                with DOWNLOAD_LOCK:
+                    stock_data = yf.download(group, start=fetch_start, end=end_date, interval=interval, group_by='ticker', threads=True, progress=False)
+            except Exception as e:
+                failed.update({symbol: f"Download failed: {e}" for symbol in group})
+                continue
+            downloads.append((group, full, stock_data))
+        return downloads, failed
+
+    def update_batch_historical_data(self, downloads, start_date, end_date, interval='5m', timezone='America/New_York'):
+        """
+        Split the grouped downloads per symbol and assign them to each ticker object (see update_historical_data)
+        :param downloads: Downloads returned by download_batch_historical_data
+        :return: Dictionary of the failed symbols and the reason of the failure
+        """
+        failed = {}
+        for group, full, stock_data in downloads:
+            for symbol in group:
+                try:
+                    if isinstance(stock_data.columns, pd.MultiIndex):
+                        # yfinance keys the grouped result with the upper case symbol
+                        key = symbol if symbol in stock_data.columns.get_level_values(0) else symbol.upper()
+                        symbol_data = stock_data[key]
+                    else:
+                        symbol_data = stock_data
+
+                    # Symbols without data for the period come back as all NaN rows
+                    symbol_data = symbol_data.dropna(how='all').copy()
+                    if symbol_data.empty and full:
+                        failed[symbol] = "No data returned"
+                        continue
+
+                    self.ticker_obj_list[symbol].update_historical_data(symbol_data, start_date, end_date, interval, timezone)
+                except Exception as e:
+                    failed[symbol] = str(e)
+        return failed
 
     def get_ticker(self, symbol):
         """
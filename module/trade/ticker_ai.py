@@ -3,6 +3,8 @@ import json
 import datetime
 
 from module.trade.ticker import Ticker
+from module.trade.bar_cache import BarCache
+from module.trade.ai_cache import AICache
 
 from pydantic import BaseModel, Field
 from llama_index.core import PromptTemplate
@@ -76,7 +78,7 @@ If the user questions is not releveant to stock market, then API query, pandas q
 
 
 class TickerAI():
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, cache=None):
 
         if llm is None:
             llm = OpenAI(
@@ -89,6 +91,9 @@ class TickerAI():
             self.llm = llm
         else:
             self.llm = llm
+        self.bar_cache = BarCache()
+        # Arguments, data and answers of the recent questions (see AICache)
+        self.cache = cache if cache is not None else AICache()
         
     def get_api_arguments(self, question=""):
         try:
@@ -202,37 +207,59 @@ class TickerAI():
             print(f"Error synthesizing the response: {e}")
             raise "Error synthesizing the response. Please provide a valid question."
 
+    def get_data(self, arguments):
+        """
+        Get the data of the API arguments, from the cache when it is still current
+        :return: Dictionary with the data and its version
+        """
+        entry = self.cache.get_data(arguments)
+        if entry is None:
+            Ticker_obj = Ticker(symbol=arguments['symbol'], bar_cache=self.bar_cache)
+            historical_data = Ticker_obj.get_historical_data(arguments['start_date'], arguments['end_date'], arguments['interval'])
+            entry = self.cache.put_data(arguments, historical_data)
+        return entry
+
     def chat(self, question=""):
         """
         Chat with the AI to get the API arguments
+        A question asked again on the same data is answered from the cache without the LLM and the download
         """
 
-        # Get the API arguments
-        arguments = self.get_api_arguments(question)
+        # Get the API arguments, the arguments of a question asked earlier today are reused
+        arguments = self.cache.get_arguments(question)
+        if arguments is None:
+            arguments = self.get_api_arguments(question)
+            if arguments is not None and self.validate_api_arguments(arguments):
+                self.cache.put_arguments(question, arguments)
 
         response = ""
         query = ""
+        version = None
 
         try:
-            symbol = arguments['symbol']
-            start_date = arguments['start_date']
-            end_date = arguments['end_date']
-            interval = arguments['interval']
-            
-            Ticker_obj = Ticker(symbol=symbol)
-            historical_data = Ticker_obj.get_historical_data(start_date, end_date, interval)
+            data = self.get_data(arguments)
+            version = data["version"]
+
+            answer = self.cache.get_answer(question, version)
+            if answer is not None:
+                print(f"Answer from the cache for: {question}")
+                return answer
+
+            # Query a copy of the data, the code written by the LLM could change the frame it runs on
+            response, query = self.query_yfinance_data(data["data"].copy(), question)
 
-            # Query the data
-            response, query = self.query_yfinance_data(historical_data, question)
-        
         except Exception as e:
             print(f"Error getting historical data, querying the data or synthesizing the response: {e}")
-        
-        finally:
-            # Synthesize the response
-            try:
-                final_response = self.synthesis(question, arguments, query, response)
-                return final_response
-            except Exception as e:
-                print(f"Error synthesizing the response: {e}")
-                return "There is some error in synthesizing the response currently. Could you please try again?"
\ No newline at end of file
+            version = None
+
+        # Synthesize the response
+        try:
+            final_response = self.synthesis(question, arguments, query, response)
+        except Exception as e:
+            print(f"Error synthesizing the response: {e}")
+            return "There is some error in synthesizing the response currently. Could you please try again?"
+
+        # Only the answers based on the data are reused
+        if version is not None:
+            self.cache.put_answer(question, version, final_response, arguments)
+        return final_response